@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from readme_summariser.clean import regex, PATTERNS, SCAN, SYMBOLS, SYMBOL_BYTES, EMPTY_LINES
+
+'''
+Compares the README cleaner against the twelve pass regex() it replaced & against its own two paths on their own (the single scan & the per construct passes) on READMEs of increasing size:
+generated sections with markup on nearly every line, the same sections between paragraphs of prose & the recorded READMEs in fixtures/readmes, which are mostly not ASCII.
+Last the recorded READMEs are cleaned one at a time as the pipeline cleans them.
+The legacy fenced code pattern is greedy, on a README with more than one code block it deletes everything from the first fence to the last,
+so the fences are taken out of every README & every cleaner does the same work, the legacy & new word counts are printed to show it
+
+Usage: python benchmarks/clean_benchmark.py [repeats]
+'''
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'readmes')
+
+SECTION = '''# project title
+
+a short description of what the project does, with a [link](https://example.com/docs) & some `inline code`.
+<img src="https://example.com/logo.png" alt="logo"> the logo sits beside this text <br>
+
+## installation
+```bash
+pip install project
+project --init
+```
+
+| option | default | description |
+|--------|---------|-------------|
+| size   | 10      | how big     |
+
+## usage
+call `project.run()` from your code: it reads settings_file = config.yml & writes the output.
+see ![diagram](docs/diagram.png) and [the guide](docs/guide.md) for details.
+
+'''
+
+'''
+legacyRegex(content)
+content: string of text content
+
+The twelve pass cleaner regex() replaced, kept to compare speed & output against
+'''
+def legacyRegex(content):
+	filtered_content = re.sub(r'\`\`\`.*\`\`\`', '', content, flags = re.MULTILINE|re.DOTALL) # remove code segments
+	filtered_content = re.sub(r'\|.*\|', '', filtered_content) # remove code segments
+	filtered_content = re.sub(r'\<.*\>', '', filtered_content) # remove any '<WORD>'
+	filtered_content = re.sub(r'\`.*\`', '', filtered_content) # remove any '`WORD`'
+	filtered_content = re.sub(r'http\S+', '', filtered_content) # remove links
+	filtered_content = re.sub(r'\[', '', filtered_content) # remove opening square brace
+	filtered_content = re.sub(r'\]', '', filtered_content) # remove closing square brace
+	filtered_content = re.sub(r'\n\s*\n', '\n', filtered_content) # remove empty lines
+	filtered_content = re.sub(r'\_', '', filtered_content) # remove underscore
+	filtered_content = re.sub(r'\#', '', filtered_content) # remove hash symbol
+	filtered_content = re.sub(r':', '', filtered_content) # remove colon
+	filtered_content = re.sub(r'=', '', filtered_content) # remove equals
+
+	return filtered_content
+
+'''
+Prose paragraph between sections of a mostly prose README
+'''
+PROSE = ('this project reads the settings of each user & then writes a short report on the changes it found, '
+	'with the hash of every file it checked so the report can be compared with the next one.\n') * 12
+
+'''
+scanRegex(content) & passesRegex(content)
+content: string of text content
+
+The cleaner with only SCAN or only the PATTERNS passes whatever the text, to time each path on every README.
+SCAN alone is the single scan cleaner the passes replaced
+'''
+def scanRegex(content):
+	return EMPTY_LINES.sub('\n', symbols(SCAN.sub('', content)))
+
+def passesRegex(content):
+	for pattern in PATTERNS:
+		content = pattern.sub('', content)
+	return EMPTY_LINES.sub('\n', symbols(content))
+
+'''
+symbols(content)
+content: string of text content
+
+Returns the content without the markdown symbols, deleted as regex() deletes them
+'''
+def symbols(content):
+	if content.isascii():
+		return content.translate(SYMBOLS)
+	return content.encode('utf-8', 'surrogatepass').translate(None, SYMBOL_BYTES).decode('utf-8', 'surrogatepass')
+
+'''
+readme(size)
+size: approximate length in bytes
+
+Returns a README of the given size made by repeating SECTION
+'''
+def readme(size):
+	return SECTION * max(1, size // len(SECTION))
+
+'''
+proseReadme(size)
+size: approximate length in bytes
+
+Returns a README of the given size made by repeating SECTION followed by PROSE
+'''
+def proseReadme(size):
+	return (SECTION + PROSE) * max(1, size // len(SECTION + PROSE))
+
+'''
+recordedReadme(size)
+size: approximate length in bytes
+
+Returns a README of the given size made by repeating the recorded READMEs, lower cased as the pipeline cleans them
+'''
+def recordedReadme(size):
+	text = '\n'.join(open(os.path.join(FIXTURES, name), encoding='utf-8').read() for name in sorted(os.listdir(FIXTURES))).lower()
+	return (text * (size // len(text) + 1))[:size]
+
+'''
+MAIN
+'''
+repeats = 5
+if len(sys.argv) > 1:
+	repeats = int(sys.argv[1])
+
+'''
+row(size, kind, cleaned)
+size: length printed for the row
+kind: name of the READMEs
+cleaned: function running a cleaner over the READMEs
+
+Times every cleaner & prints their times, the speedup of regex() over the legacy cleaner & both word counts
+'''
+def row(size, kind, cleaned):
+	if not (cleaned(scanRegex) == cleaned(passesRegex) == cleaned(regex)):
+		print('output differs between the scan & the passes on ' + kind)
+	times = [min(timeit.repeat(lambda: cleaned(cleaner), number=1, repeat=repeats)) * 1000 for cleaner in (legacyRegex, scanRegex, passesRegex, regex)]
+	print('{:>10} {:>8} {:>12.2f} {:>10.2f} {:>12.2f} {:>13.2f} {:>7.1f}x {:>12} {:>12}'.format(
+		size, kind, *times, times[0] / times[3], len(cleaned(legacyRegex).split()), len(cleaned(regex).split())))
+
+print('{:>10} {:>8} {:>12} {:>10} {:>12} {:>13} {:>8} {:>12} {:>12}'.format('size', 'kind', 'legacy (ms)', 'scan (ms)', 'passes (ms)', 'cleaner (ms)', 'vs leg', 'legacy words', 'words'))
+for size in (4 * 1024, 64 * 1024, 512 * 1024, 4 * 1024 * 1024):
+	for kind, make in (('markup', readme), ('prose', proseReadme), ('recorded', recordedReadme)):
+		content = make(size).replace('```', '')
+		row(len(content), kind, lambda cleaner: cleaner(content))
+
+texts = [open(os.path.join(FIXTURES, name), encoding='utf-8').read().lower().replace('```', '') for name in sorted(os.listdir(FIXTURES))]
+row(sum(len(text) for text in texts), 'each', lambda cleaner: '\n'.join(cleaner(text) for text in texts))
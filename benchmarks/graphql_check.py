@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import stub_server
+from readme_summariser import fetch, graphql
+from readme_summariser.clean import regex
+
+'''
+Fetches the recorded repos through GraphQL batching against the local stub server & checks every README & topic list matches what the REST path would give.
+Exits with status 1 if any repo differs
+
+Usage: python benchmarks/graphql_check.py [fixtures.json]
+'''
+
+'''
+MAIN
+'''
+path = stub_server.FIXTURES
+if len(sys.argv) > 1:
+	path = sys.argv[1]
+with open(path) as f:
+	repos = json.load(f)
+
+server, URL = stub_server.start(repos)
+graphql.GRAPHQL_URL = URL
+fetch.configure(path=os.path.join(tempfile.mkdtemp(), 'http.sqlite'))
+
+names = list(repos) + ['octo/missing-repo']
+documents = graphql.fetchDocuments(names)
+
+mismatches = 0
+for repo in names:
+	document = documents[repo]
+	fixture = repos.get(repo, {'readme': None, 'topics': None})
+	expected = regex(fixture['readme'].lower()) if fixture['readme'] != None else ""
+	if document.found != (fixture['readme'] != None) or document.content != expected or document.topics != fixture['topics']:
+		mismatches += 1
+		print('MISMATCH ' + repo)
+
+print(f'{len(names)} repos fetched in {server.requests} GraphQL requests ({2 * len(names)} REST requests)')
+print(f'{mismatches} mismatches')
+server.shutdown()
+sys.exit(1 if mismatches else 0)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import os
+import sys
+import glob
+import json
+import math
+import time
+import tempfile
+from urllib.parse import unquote
+
+'''
+Times every stage of the pipeline on the recorded corpus (fixtures/corpus.json), with every GitHub request answered by the local stub server from its files:
+the READMEs in fixtures/readmes, grouped by their size, & the topic & search pages in fixtures/pages.
+The caches are kept in a temporary directory so every run starts cold.
+Results are saved to benchmarks/results/ & compared with the previous run on the same corpus & summariser, a stage more than 20% slower at p50 is flagged as a regression
+
+Stages
+decode: de-JSON & base64 decode of a contents API response
+raw: decode of a raw media type response
+regex: cleaning within the processing budget (clean.budgeted)
+sent_tokenize: nltk sentence splitting, skipped if the punkt data is not installed
+summarize: the summariser in use, without the summary cache
+topics: topic scoring of the summary against the repo's topics
+topicReq, searchReq: fetching & scraping every topic page & search page from the stub
+findSimilar: the whole similar repo lookup (index, scraping, fetching & summarising the similar READMEs) of every topic page on empty caches
+duplicate: MinHash signature & LSH lookup of a README against the duplicate index
+combine: summary of SIMILAR_COUNT summaries in a sentence graph kept between calls, each call moving along one README as consecutive repos of one topic do
+
+Usage: python benchmarks/pipeline_benchmark.py [repeats]
+'''
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(DIRECTORY, 'results')
+CACHES = tempfile.mkdtemp()
+os.environ['README_SUMMARISER_CACHE'] = os.path.join(CACHES, 'http.sqlite')
+os.environ['README_SUMMARISER_SUMMARIES'] = os.path.join(CACHES, 'summaries.sqlite')
+os.environ['README_SUMMARISER_INDEX'] = os.path.join(CACHES, 'index.sqlite')
+os.environ['README_SUMMARISER_DUPLICATES'] = os.path.join(CACHES, 'duplicates.sqlite')
+
+sys.path.insert(0, os.path.join(DIRECTORY, '..'))
+import stub_server
+from readme_summariser import fetch, document, clean, summarise, topics, similar, index, dedupe, textrank, lazy, parallel
+
+'''
+SIZES: README groups by the largest size in bytes they hold, READMEs go in the first group they fit
+THRESHOLD: p50 slowdown against the previous run flagged as a regression
+'''
+SIZES = {'small': 8 * 1024, 'medium': 24 * 1024, 'large': math.inf}
+THRESHOLD = 1.2
+
+'''
+percentile(values, p)
+values: sorted list of timings
+p: fraction between 0 & 1
+
+Returns the nearest rank percentile
+'''
+def percentile(values, p):
+	return values[max(0, min(len(values) - 1, math.ceil(p * len(values)) - 1))]
+
+'''
+measure(function, inputs)
+function: stage taking one input
+inputs: list of inputs
+
+Returns a dict of the count, p50 & p99 in milliseconds & throughput per second of the stage
+'''
+def measure(function, inputs):
+	timings = []
+	for item in inputs:
+		start = time.perf_counter()
+		function(item)
+		timings.append(time.perf_counter() - start)
+	timings.sort()
+	return {
+		'count': len(timings),
+		'p50': percentile(timings, 0.5) * 1000,
+		'p99': percentile(timings, 0.99) * 1000,
+		'throughput': len(timings) / sum(timings),
+	}
+
+'''
+findSimilar(topic)
+topic: topic to find similar repos for
+
+Runs findSimilar on new empty caches, so the pages & similar READMEs are requested from the stub & summarised every time
+
+Returns the similar repo summaries & their processed sentences
+'''
+def findSimilar(topic):
+	directory = tempfile.mkdtemp(dir=CACHES)
+	fetch.configure(path=os.path.join(directory, 'http.sqlite'))
+	summarise.SUMMARIES_PATH = os.path.join(directory, 'summaries.sqlite')
+	summarise.store = None
+	index.INDEX_PATH = os.path.join(directory, 'index.sqlite')
+	index.index = None
+	dedupe.DUPLICATES_PATH = os.path.join(directory, 'duplicates.sqlite')
+	dedupe.duplicates = None
+	return similar.findSimilar(topic)
+
+'''
+duplicate(content)
+content: cleaned README
+
+Looks the README up in the duplicate index with the recent signatures cleared, so the signature is always computed
+
+Returns the hash of its near-duplicate or None
+'''
+def duplicate(content):
+	dedupe.recent.clear()
+	return dedupe.getDuplicates().find(dedupe.signature(content))
+
+'''
+previous()
+
+Returns the results of the last saved run on the same corpus & summariser or None
+'''
+def previous():
+	for path in reversed(sorted(glob.glob(os.path.join(RESULTS, '*.json')))):
+		with open(path) as f:
+			last = json.load(f)
+		if last.get('corpus') == os.path.basename(stub_server.CORPUS) and last['summariser'] == summarise.SUMMARISER:
+			return last
+	return None
+
+'''
+MAIN
+'''
+repeats = 3
+if len(sys.argv) > 1:
+	repeats = int(sys.argv[1])
+
+repos, pages = stub_server.load(stub_server.CORPUS)
+server, URL = stub_server.start(repos, 0, pages)
+stub_server.redirect(fetch.getSession(), URL[:-len('/graphql')])
+topicPages = [unquote(page[len('/topics/'):]) for page in pages if page.startswith('/topics/')]
+searchPages = [unquote(page[len('/search?q='):]) for page in pages if page.startswith('/search?q=')]
+tokenize = lazy.load('nltk.tokenize').sent_tokenize
+
+try:
+	tokenize('Punkt check. Second sentence.')
+	tokenizing = True
+except LookupError:
+	tokenizing = False
+	print('sent_tokenize skipped, the nltk punkt data is not installed')
+
+groups = {size: [] for size in SIZES}
+for repo in repos:
+	if repos[repo]['readme'] != None:
+		length = len(repos[repo]['readme'].encode('utf-8'))
+		groups[next(size for size, limit in SIZES.items() if length <= limit)].append(repo)
+
+results = {}
+for size, names in groups.items():
+	if len(names) == 0:
+		continue
+	names = names * repeats
+	URLs = [f'https://api.github.com/repos/{repo}/contents/README.md' for repo in names]
+	jsonResponses = [fetch.get(URL) for URL in URLs]
+	rawResponses = [fetch.get(URL, headers={'Accept': document.RAW}, limit=document.MAX_SIZE) for URL in URLs]
+	texts = [document.decode(req).lower() for req in jsonResponses]
+	contents = [clean.budgeted(text)[0] for text in texts]
+	entries = [summarise.compute(content) for content in contents]
+	summaries = [entry[0] for entry in entries]
+	sentences = [entry[1] for entry in entries]
+
+	stages = {}
+	stages['decode'] = measure(document.decode, jsonResponses)
+	stages['raw'] = measure(lambda req: str(req.content, 'utf-8', 'ignore'), rawResponses)
+	stages['regex'] = measure(clean.budgeted, texts)
+	if tokenizing:
+		stages['sent_tokenize'] = measure(tokenize, contents)
+	stages['summarize'] = measure(summarise.compute, contents)
+	stages['topics'] = measure(lambda pair: topics.best(topics.rank(pair[0], pair[1])), [(summary, repos[repo]['topics']) for summary, repo in zip(summaries, names)])
+	stages['duplicate'] = measure(duplicate, contents)
+	graph = textrank.SentenceGraph()
+	window = parallel.SIMILAR_COUNT
+	stages['combine'] = measure(lambda i: graph.summarize(summaries=summaries[i:i + window], sentences=sentences[i:i + window]), list(range(len(names))))
+	results[size] = stages
+
+stages = {}
+ttl = fetch.TTL
+fetch.configure(ttl=0)
+stages['topicReq'] = measure(lambda topic: similar.topicReq(fetch.get(f'https://github.com/topics/{topic}')), topicPages * repeats)
+stages['searchReq'] = measure(lambda term: similar.searchReq(fetch.get(f'https://github.com/search?q={term}')), searchPages * repeats)
+fetch.configure(ttl=ttl)
+stages['findSimilar'] = measure(findSimilar, topicPages * repeats)
+results['pages'] = stages
+
+'''
+Report & compare with the last run
+'''
+last = previous()
+print(f'{"size":8}{"stage":15}{"p50 ms":>10}{"p99 ms":>10}{"per s":>10}  change')
+for size, stages in results.items():
+	for stage, result in stages.items():
+		change = ''
+		if last != None and stage in last['results'].get(size, {}):
+			ratio = result['p50'] / last['results'][size][stage]['p50']
+			change = f'{(ratio - 1) * 100:+.0f}%' + (' REGRESSION' if ratio > THRESHOLD else '')
+		print(f'{size:8}{stage:15}{result["p50"]:10.2f}{result["p99"]:10.2f}{result["throughput"]:10.1f}  {change}')
+
+os.makedirs(RESULTS, exist_ok=True)
+path = os.path.join(RESULTS, time.strftime('%Y%m%d-%H%M%S') + '.json')
+with open(path, 'w') as f:
+	json.dump({'time': time.time(), 'repeats': repeats, 'corpus': os.path.basename(stub_server.CORPUS), 'summariser': summarise.SUMMARISER, 'results': results}, f, indent='\t')
+print('saved ' + path)
+server.shutdown()
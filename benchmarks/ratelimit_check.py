@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import stub_server
+from readme_summariser import fetch, scheduler, repocounter
+
+'''
+Counts the README statuses of the recorded repos against the local stub server while it refuses the first READMEs with a secondary rate limit,
+& checks they are retried rather than counted as failed, with the same statuses as a run that was not rate limited.
+Exits with status 1 if any status differs
+
+Usage: python benchmarks/ratelimit_check.py [fixtures.json]
+'''
+
+'''
+MAIN
+'''
+path = stub_server.FIXTURES
+if len(sys.argv) > 1:
+	path = sys.argv[1]
+with open(path) as f:
+	repos = json.load(f)
+
+server, URL = stub_server.start(repos)
+stub_server.redirect(fetch.getSession(), URL[:-len('/graphql')])
+scheduler.BACKOFF = 0
+items = ['https://api.github.com/repos/' + repo for repo in list(repos) + ['octo/missing-repo']]
+
+fetch.configure(path=os.path.join(tempfile.mkdtemp(), 'http.sqlite'))
+expected = repocounter.readmeStatuses(items)
+
+refused = min(3, len(items))
+server.secondary = refused
+fetch.configure(path=os.path.join(tempfile.mkdtemp(), 'http.sqlite'))
+statuses = repocounter.readmeStatuses(items)
+limited = fetch.getScheduler(items[0]).limited
+
+mismatches = sum(1 for status, expectedStatus in zip(statuses, expected) if status != expectedStatus)
+print(f'{len(items)} repos counted, {refused} READMEs refused, {limited} rate limited responses retried, {statuses.count("failed")} failed')
+print(f'{mismatches} mismatches')
+server.shutdown()
+sys.exit(1 if mismatches or limited != refused or 'failed' in statuses else 0)
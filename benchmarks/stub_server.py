@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import json
+import time
+import base64
+import threading
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.adapters import HTTPAdapter
+
+'''
+Local stand in for GitHub, answering from recorded repos so the pipeline can be run & timed without GitHub.
+Fixtures are a JSON object of repo ID to {"readme": text or null, "topics": [names]}, repos missing from it are answered as not found.
+A corpus file (fixtures/corpus.json) holds {"repos": {repo ID: {"readme": file in fixtures/readmes or null, "topics": [names]}}, "pages": {request path: file in fixtures/pages}},
+its pages are served as they are instead of the rendered topic & search pages.
+It serves
+POST /graphql: README & topic batch queries
+GET /repos/OWNER/REPO/contents/README.md: the README as JSON or as the raw media type
+GET /repos/OWNER/REPO/topics: the repo's topics
+GET /topics/TOPIC: a topic page listing the repos with that topic
+GET /search?q=TERM: a search page listing the repos whose README mentions the term
+The first server.secondary README requests are refused with a 403 secondary rate limit, as GitHub does when requests come too quickly
+
+Usage: python benchmarks/stub_server.py [fixtures.json or corpus.json] [port]
+then set README_SUMMARISER_GRAPHQL=http://127.0.0.1:PORT/graphql, or call redirect() to send all GitHub requests of a session to it
+'''
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'repos.json')
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.json')
+README = re.compile(r'^/repos/([^/]+/[^/]+)/contents/README\.md$')
+TOPICS = re.compile(r'^/repos/([^/]+/[^/]+)/topics$')
+TOPIC_PAGE = re.compile(r'^/topics/([^/?]+)$')
+SEARCH_PAGE = re.compile(r'^/search\?q=(.*)$')
+REPOSITORY = re.compile(r'(r\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+
+'''
+answer(query, repos)
+query: GraphQL query built by readme_summariser.graphql.query
+repos: fixtures dict
+
+Returns the reply dict GitHub would give for the query
+'''
+def answer(query, repos):
+	data = {}
+	errors = []
+	for alias, owner, name in REPOSITORY.findall(query):
+		repo = json.loads(owner) + '/' + json.loads(name)
+		if repo not in repos:
+			data[alias] = None
+			errors.append({'type': 'NOT_FOUND', 'path': [alias], 'message': f"Could not resolve to a Repository with the name '{repo}'."})
+			continue
+		fixture = repos[repo]
+		readme = None
+		if fixture['readme'] != None:
+			readme = {'text': fixture['readme'], 'isTruncated': False}
+		data[alias] = {
+			'readme': readme,
+			'repositoryTopics': {'nodes': [{'topic': {'name': topic}} for topic in fixture['topics']]},
+		}
+	reply = {'data': data}
+	if errors:
+		reply['errors'] = errors
+	return reply
+
+'''
+topicPage(topic, repos) & searchPage(term, repos)
+topic: topic name
+term: search term
+repos: fixtures dict
+
+Render pages laid out like GitHub's topic & search results, listing the matching repos
+
+Returns the page HTML
+'''
+def topicPage(topic, repos):
+	links = [f'<a\n        href="/{repo}"\n        data-ga-click="Explore, go to repository, location: explore feed">{repo}</a>' for repo in repos if topic in repos[repo]['topics']]
+	return '<html><body>\n' + '\n'.join(links) + '\n</body></html>'
+
+def searchPage(term, repos):
+	items = []
+	for repo in repos:
+		if repos[repo]['readme'] != None and term.lower() in repos[repo]['readme'].lower():
+			items.append(f'<li data-hydro-click="{{&quot;payload&quot;:{{&quot;result&quot;:{{&quot;url&quot;:&quot;https://github.com/{repo}&quot;,&quot;model_name&quot;:&quot;Repository&quot;,&quot;originating_url&quot;:&quot;https://github.com/search&quot;}}}}}}">{repo}</li>')
+	return '<html><body><ul class="repo-list">\n' + '\n'.join(items) + '\n</ul></body></html>'
+
+'''
+load(path)
+path: fixtures or corpus JSON file
+
+Reads the repos & pages, a corpus's READMEs & pages are read from the readmes & pages directories next to it
+
+Returns the fixtures dict & a dict of request path to page bytes, empty for a fixtures file
+'''
+def load(path):
+	with open(path, encoding='utf-8') as f:
+		fixtures = json.load(f)
+	if 'repos' not in fixtures:
+		return fixtures, {}
+
+	directory = os.path.dirname(os.path.abspath(path))
+	repos = {}
+	for repo, fixture in fixtures['repos'].items():
+		readme = None
+		if fixture['readme'] != None:
+			with open(os.path.join(directory, 'readmes', fixture['readme']), encoding='utf-8') as f:
+				readme = f.read()
+		repos[repo] = {'readme': readme, 'topics': fixture['topics']}
+	pages = {}
+	for page, name in fixtures['pages'].items():
+		with open(os.path.join(directory, 'pages', name), 'rb') as f:
+			pages[page] = f.read()
+	return repos, pages
+
+'''
+route(method, path, headers, body, repos, pages)
+method: 'GET' or 'POST'
+path: request path & query
+headers: request headers
+body: request body bytes
+repos: fixtures dict
+pages: dict of request path to recorded page bytes answered before any rendered page, or None
+
+Returns the status, content type & body bytes of the stub's response
+'''
+def route(method, path, headers, body, repos, pages=None):
+	if method == 'GET' and pages != None and path in pages:
+		return 200, 'text/html; charset=utf-8', pages[path]
+
+	if method == 'POST' and path == '/graphql':
+		return 200, 'application/json', json.dumps(answer(json.loads(body)['query'], repos)).encode('utf-8')
+
+	match = README.match(path)
+	if match:
+		fixture = repos.get(match.group(1))
+		if fixture == None or fixture['readme'] == None:
+			return 404, 'application/json', b'{"message": "Not Found"}'
+		text = fixture['readme'].encode('utf-8')
+		if headers.get('Accept') == 'application/vnd.github.raw':
+			return 200, 'application/vnd.github.raw', text
+		return 200, 'application/json', json.dumps({'encoding': 'base64', 'content': base64.b64encode(text).decode('ascii')}).encode('utf-8')
+
+	match = TOPICS.match(path)
+	if match:
+		fixture = repos.get(match.group(1))
+		if fixture == None:
+			return 404, 'application/json', b'{"message": "Not Found"}'
+		return 200, 'application/json', json.dumps({'names': fixture['topics']}).encode('utf-8')
+
+	match = TOPIC_PAGE.match(path)
+	if match:
+		return 200, 'text/html', topicPage(unquote(match.group(1)), repos).encode('utf-8')
+
+	match = SEARCH_PAGE.match(path)
+	if match:
+		return 200, 'text/html', searchPage(unquote(match.group(1)), repos).encode('utf-8')
+
+	return 404, 'text/plain', b'Not Found'
+
+'''
+start(repos, port, pages)
+repos: fixtures dict
+port: port to listen on, any free port if 0
+pages: dict of request path to recorded page bytes as load returns them, or None
+
+Starts the stub in a background thread, the number of requests answered is kept in server.requests.
+Setting server.secondary to N refuses the next N README requests with a secondary rate limit
+
+Returns the server & its GraphQL URL
+'''
+def start(repos, port=0, pages=None):
+	class Handler(BaseHTTPRequestHandler):
+		def do_GET(self):
+			self.reply(b'')
+
+		def do_POST(self):
+			self.reply(self.rfile.read(int(self.headers['Content-Length'])))
+
+		def reply(self, body):
+			with server.lock:
+				server.requests += 1
+				refused = server.secondary > 0 and README.match(self.path) != None
+				if refused:
+					server.secondary -= 1
+			if refused:
+				status, contentType, data = 403, 'application/json', b'{"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."}'
+			else:
+				status, contentType, data = route(self.command, self.path, self.headers, body, repos, pages)
+			self.send_response(status)
+			if refused:
+				self.send_header('X-RateLimit-Limit', '5000')
+				self.send_header('X-RateLimit-Remaining', '4999')
+				self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+			self.send_header('Content-Type', contentType)
+			self.send_header('Content-Length', str(len(data)))
+			self.end_headers()
+			self.wfile.write(data)
+
+		def log_message(self, format, *args):
+			pass
+
+	server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+	server.requests = 0
+	server.secondary = 0
+	server.lock = threading.Lock()
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server, f'http://127.0.0.1:{server.server_address[1]}/graphql'
+
+'''
+StubAdapter(base)
+base: URL of the stub, e.g. http://127.0.0.1:8348
+
+Transport adapter sending requests for api.github.com & github.com to the stub instead
+'''
+class StubAdapter(HTTPAdapter):
+	def __init__(self, base):
+		super().__init__()
+		self.base = base
+
+	def send(self, request, **kwargs):
+		request.url = re.sub(r'^https://(?:api\.)?github\.com', self.base, request.url)
+		return super().send(request, **kwargs)
+
+'''
+redirect(session, base)
+session: requests Session, e.g. readme_summariser.fetch.getSession()
+base: URL of the stub
+
+Sends every GitHub request made with the session to the stub
+'''
+def redirect(session, base):
+	session.mount('https://api.github.com/', StubAdapter(base))
+	session.mount('https://github.com/', StubAdapter(base))
+
+'''
+MAIN
+'''
+if __name__ == '__main__':
+	path = FIXTURES
+	port = 8348
+	if len(sys.argv) > 1:
+		path = sys.argv[1]
+	if len(sys.argv) > 2:
+		port = int(sys.argv[2])
+
+	repos, pages = load(path)
+	server, URL = start(repos, port, pages)
+	print('serving ' + path + ' at ' + URL)
+	try:
+		threading.Event().wait()
+	except KeyboardInterrupt:
+		server.shutdown()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from summa.summarizer import summarize
+from readme_summariser import textrank
+from readme_summariser import clean
+
+'''
+Checks the vectorised TextRank engine gives the same summaries as summa & compares their throughput on generated READMEs of increasing sentence counts,
+then on the recorded READMEs in fixtures/readmes, both raw & cleaned the way the pipeline cleans them.
+Exits with status 1 if any summary differs
+
+Usage: python benchmarks/summarise_benchmark.py [documents per size]
+'''
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'readmes')
+
+WORDS = '''project library install usage configure server client request response data model train test build deploy
+python javascript module package function class method api endpoint token cache file directory image plugin support
+fast simple small lightweight modern open source command line interface tool framework application web mobile user'''.split()
+
+'''
+readme(sentences, seed)
+sentences: number of sentences
+seed: random seed so every run benchmarks the same text
+
+Returns cleaned README-like text of random sentences drawn from WORDS
+'''
+def readme(sentences, seed):
+	generator = random.Random(seed)
+	text = []
+	for _ in range(sentences):
+		text.append(' '.join(generator.choice(WORDS) for _ in range(generator.randint(4, 20))) + '.')
+	return '\n'.join(text)
+
+'''
+compare(label, documents)
+label: name of the row printed
+documents: list of texts to summarise with both engines
+
+Prints the throughput of both engines & how many of their summaries match
+
+Returns the positions in documents whose summaries differ
+'''
+def compare(label, documents):
+	start = time.perf_counter()
+	expected = [summarize(document, words=50) for document in documents]
+	summaTime = time.perf_counter() - start
+
+	start = time.perf_counter()
+	actual = [textrank.summarize(document, words=50) for document in documents]
+	textrankTime = time.perf_counter() - start
+
+	differ = [i for i in range(len(documents)) if expected[i] != actual[i]]
+	print('{:>10} {:>14.2f} {:>16.2f} {:>7.1f}x {:>8}'.format(label, len(documents) / summaTime, len(documents) / textrankTime, summaTime / textrankTime, str(len(documents) - len(differ)) + '/' + str(len(documents))))
+	return differ
+
+'''
+MAIN
+'''
+count = 5
+if len(sys.argv) > 1:
+	count = int(sys.argv[1])
+
+mismatches = 0
+print('{:>10} {:>14} {:>16} {:>8} {:>8}'.format('sentences', 'summa (doc/s)', 'textrank (doc/s)', 'speedup', 'parity'))
+for sentences in (10, 50, 200, 800):
+	mismatches += len(compare(sentences, [readme(sentences, seed) for seed in range(count)]))
+
+names = sorted(os.listdir(FIXTURES))
+texts = [open(os.path.join(FIXTURES, name), encoding='utf-8').read() for name in names]
+print()
+print('{:>10} {:>14} {:>16} {:>8} {:>8}'.format('fixtures', 'summa (doc/s)', 'textrank (doc/s)', 'speedup', 'parity'))
+for label, documents in (('raw', texts), ('cleaned', [clean.budgeted(text.lower())[0] for text in texts])):
+	differ = compare(label, documents)
+	mismatches += len(differ)
+	for i in differ:
+		print('{:>10} differs on {}'.format('', names[i]))
+
+sys.exit(1 if mismatches > 0 else 0)
@@ -0,0 +1,11 @@
+'''
+readme_summariser
+
+Shared code for the README summariser scripts & the library API.
+summariseRepo is loaded on first use so importing the package stays cheap
+'''
+def __getattr__(name):
+	if name == 'summariseRepo':
+		from readme_summariser.pipeline import summariseRepo
+		return summariseRepo
+	raise AttributeError(f"module 'readme_summariser' has no attribute '{name}'")
@@ -0,0 +1,4 @@
+import sys
+from readme_summariser import cli
+
+sys.exit(cli.main())
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+'''
+Cache(path, maxSize)
+path: file location of the SQLite database, created if it does not exist
+maxSize: upper bound on the total size in bytes of the stored response bodies
+
+Persistent store of HTTP responses keyed by URL.
+Alongside the body, the ETag & Last-Modified validators are kept so stale entries can be revalidated with a conditional request.
+Once the stored bodies grow past maxSize the least recently used entries are evicted.
+'''
+class Cache:
+	def __init__(self, path, maxSize):
+		directory = os.path.dirname(path)
+		if directory != "":
+			os.makedirs(directory, exist_ok=True)
+
+		self.path = path
+		self.maxSize = maxSize
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute('''CREATE TABLE IF NOT EXISTS responses (
+			url TEXT PRIMARY KEY,
+			status INTEGER,
+			headers TEXT,
+			body BLOB,
+			etag TEXT,
+			modified TEXT,
+			fetched REAL,
+			accessed REAL,
+			size INTEGER)''')
+		self.db.execute('CREATE INDEX IF NOT EXISTS accessed ON responses (accessed)')
+		self.db.commit()
+
+	'''
+	get(URL)
+	URL: request URL
+
+	Returns a dict of the stored response for the URL or None if it is not cached
+	'''
+	def get(self, URL):
+		with self.lock:
+			row = self.db.execute('SELECT status, headers, body, etag, modified, fetched FROM responses WHERE url = ?', (URL,)).fetchone()
+			if row == None:
+				return None
+			self.db.execute('UPDATE responses SET accessed = ? WHERE url = ?', (time.time(), URL))
+			self.db.commit()
+
+		return {
+			'status': row[0],
+			'headers': json.loads(row[1]),
+			'body': row[2],
+			'etag': row[3],
+			'modified': row[4],
+			'fetched': row[5],
+		}
+
+	'''
+	put(URL, status, headers, body)
+	URL: request URL
+	status: HTTP status code of the response
+	headers: dict of response headers
+	body: bytes of the response body
+
+	Stores the response, replacing any previous entry for the URL, then evicts entries if the cache is over size
+	'''
+	def put(self, URL, status, headers, body):
+		now = time.time()
+		with self.lock:
+			self.db.execute('REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+				URL, status, json.dumps(headers), body,
+				headers.get('ETag'), headers.get('Last-Modified'),
+				now, now, len(body)))
+			self.evict()
+			self.db.commit()
+
+	'''
+	touch(URL)
+	URL: request URL
+
+	Marks the stored response as freshly validated, used when the server answers a conditional request with 304 Not Modified
+	'''
+	def touch(self, URL):
+		now = time.time()
+		with self.lock:
+			self.db.execute('UPDATE responses SET fetched = ?, accessed = ? WHERE url = ?', (now, now, URL))
+			self.db.commit()
+
+	'''
+	evict()
+
+	Removes the least recently used entries until the stored bodies fit within maxSize.
+	Expects the caller to hold the lock
+	'''
+	def evict(self):
+		total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+		if total <= self.maxSize:
+			return
+
+		for URL, size in self.db.execute('SELECT url, size FROM responses ORDER BY accessed').fetchall():
+			self.db.execute('DELETE FROM responses WHERE url = ?', (URL,))
+			total -= size
+			if total <= self.maxSize:
+				break
+
+	'''
+	clear()
+
+	Removes every stored response
+	'''
+	def clear(self):
+		with self.lock:
+			self.db.execute('DELETE FROM responses')
+			self.db.commit()
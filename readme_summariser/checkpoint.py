@@ -0,0 +1,80 @@
+import os
+import json
+
+'''
+Checkpoint(path, records, resume)
+path: file listing the ID of every completed repo, one per line
+records: JSONL file the finished repo records are written to
+resume: if true both files are appended to & previously completed repos are skipped, otherwise both are started afresh
+
+Tracks which repos a batch run has finished so an interrupted run can carry on where it stopped.
+A repo is completed once its record is written, the record file is also read on resume in case a run stopped between writing a record & its checkpoint line
+'''
+class Checkpoint:
+	def __init__(self, path, records, resume):
+		self.done = set()
+		if resume:
+			self.done |= load(path)
+			for record in readRecords(records):
+				self.done.add(record['repo'])
+
+		mode = 'a' if resume else 'w'
+		self.checkpointFile = open(path, mode)
+		self.recordFile = open(records, mode)
+		if resume and self.recordFile.tell() > 0:
+			with open(records, 'rb') as f:
+				f.seek(-1, os.SEEK_END)
+				if f.read(1) != b'\n':
+					self.recordFile.write('\n')
+
+	'''
+	complete(record)
+	record: dict describing the finished repo, its 'repo' key is used as the ID
+
+	Writes the record as a JSONL line & marks the repo as completed, both files are flushed so no finished work is lost
+	'''
+	def complete(self, record):
+		self.recordFile.write(json.dumps(record) + '\n')
+		self.recordFile.flush()
+		os.fsync(self.recordFile.fileno())
+
+		self.checkpointFile.write(record['repo'] + '\n')
+		self.checkpointFile.flush()
+		self.done.add(record['repo'])
+
+	'''
+	close()
+
+	Closes the checkpoint & record files
+	'''
+	def close(self):
+		self.checkpointFile.close()
+		self.recordFile.close()
+
+'''
+load(path)
+path: checkpoint file
+
+Returns the set of completed repo ID's, empty if the file does not exist
+'''
+def load(path):
+	if not os.path.exists(path):
+		return set()
+	with open(path) as f:
+		return set(line.strip() for line in f if line.strip() != '')
+
+'''
+readRecords(path)
+path: JSONL record file
+
+Yields each record in the file, a line left incomplete by an interrupted write is skipped
+'''
+def readRecords(path):
+	if not os.path.exists(path):
+		return
+	with open(path) as f:
+		for line in f:
+			try:
+				yield json.loads(line)
+			except ValueError:
+				continue
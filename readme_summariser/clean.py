@@ -0,0 +1,164 @@
+import os
+import re
+
+'''
+Markdown structure removed from a README when it is cleaned.
+PATTERNS: one pass per construct for ASCII text. Every pattern starts with a literal, so the regex engine jumps between its occurrences with a fast substring search instead of testing every character,
+which a single scan over all the alternatives cannot do. Code is removed first so nothing inside it is seen by the later passes
+SCAN: the same alternatives in one scan for any other text. Such text is mostly held with two or four bytes per character, where the substring search gives the passes no head start,
+so one scan is faster than six
+'''
+PATTERNS = [re.compile(pattern) for pattern in (
+	r'`(?:``[\s\S]*?```|[^`\n]*`)',   # fenced code, matched lazily so text between two blocks is kept, or inline code
+	r'<(?:!--[\s\S]*?-->|[^<>\n]*>)', # HTML comments, which can span lines, or a single HTML tag
+	r'\|[^\n]*\|',                    # a table row from its first to last pipe
+	r'!\[[^\]\n]*\]\([^)\n]*\)',      # markdown image including its alt text & target
+	r'\]\([^)\n]*\)',                 # the '](target)' half of a markdown link, leaving the link text
+	r'http\S+',                       # bare URL's
+)]
+SCAN = re.compile('|'.join(pattern.pattern for pattern in PATTERNS))
+
+'''
+Square braces, underscore, hash, colon & equals are deleted after the markdown structure.
+str.translate is only fast on ASCII text, anything else (an emoji, a dash or a copyright sign) sends it through a slow per character lookup,
+so other text has them deleted from its UTF-8 bytes, where these ASCII bytes never occur inside another character
+'''
+SYMBOLS = str.maketrans('', '', '[]_#:=')
+SYMBOL_BYTES = b'[]_#:='
+EMPTY_LINES = re.compile(r'\n\s*\n')
+
+'''
+regex(content)
+content: string of text content
+
+Removes code, HTML, tables, links & markdown symbols from a body of text using the precompiled PATTERNS or SCAN, then collapses the empty lines left behind
+
+Returns the input string minus all the regex terms
+'''
+def regex(content):
+	if content.isascii():
+		filtered_content = content
+		for pattern in PATTERNS:
+			filtered_content = pattern.sub('', filtered_content)
+		filtered_content = filtered_content.translate(SYMBOLS)
+	else:
+		filtered_content = SCAN.sub('', content)
+		filtered_content = filtered_content.encode('utf-8', 'surrogatepass').translate(None, SYMBOL_BYTES).decode('utf-8', 'surrogatepass')
+	filtered_content = EMPTY_LINES.sub('\n', filtered_content)
+
+	return filtered_content
+
+'''
+Processing budget for very large READMEs, each can be overridden from the environment
+
+BUDGET: characters of cleaned text kept for sentence splitting & summarising, READMEs no longer than this are cleaned whole
+SECTIONS: number of sections (the text before the first heading & under each heading after it) kept from a README over the budget
+CHUNK_SIZE: characters cleaned at a time within a long section, so cleaning stops soon after the budget is reached
+'''
+BUDGET = int(os.environ.get('README_SUMMARISER_BUDGET', 32 * 1024))
+SECTIONS = int(os.environ.get('README_SUMMARISER_SECTIONS', 12))
+CHUNK_SIZE = 16 * 1024
+
+'''
+Lines starting a markdown heading or a code fence, headings inside fences are not section boundaries
+'''
+BOUNDARY = re.compile(r'^(?:(#{1,6})\s|```|~~~)', re.MULTILINE)
+
+'''
+sections(content)
+content: string of raw README text
+
+Yields the README split into sections, the text before the first heading followed by each heading & the text under it
+'''
+def sections(content):
+	start = 0
+	fenced = False
+	for match in BOUNDARY.finditer(content):
+		if match.group(1) == None:
+			fenced = not fenced
+		elif not fenced and match.start() > start:
+			yield content[start:match.start()]
+			start = match.start()
+	yield content[start:]
+
+'''
+fences(section)
+section: string of raw README text
+
+Finds the code blocks of the section, toggling on fence lines as sections does, a fence left open is not a block
+
+Returns a list of (start, end) positions of the opening & closing fence line of each block
+'''
+def fences(section):
+	blocks = []
+	opened = None
+	for match in BOUNDARY.finditer(section):
+		if match.group(1) != None:
+			continue
+		if opened == None:
+			opened = match.start()
+		else:
+			blocks.append((opened, match.start()))
+			opened = None
+	return blocks
+
+'''
+chunks(section, size)
+section: string of raw README text
+size: most characters in a chunk
+
+Yields the section in chunks of at most size characters, split at line ends where there is one.
+Chunks are never split inside a code block so it is still removed whole, a code block longer than size is kept in one chunk
+'''
+def chunks(section, size):
+	blocks = fences(section)
+	start = 0
+	while len(section) - start > size:
+		end = section.rfind('\n', start, start + size) + 1
+		if end <= start:
+			end = start + size
+		for opened, closed in blocks:
+			if opened < end <= closed:
+				end = opened if opened > start else section.find('\n', closed) + 1 or len(section)
+				break
+		yield section[start:end]
+		start = end
+	yield section[start:]
+
+'''
+budgeted(content, budget, count)
+content: string of raw README text
+budget: characters of cleaned text to keep
+count: number of sections to keep
+
+Cleans the README like regex, but a README longer than the budget is cleaned a chunk at a time, keeping only its first count sections
+& stopping at the last line end before budget characters of cleaned text
+
+Returns the cleaned text & whether any of the README was left out
+'''
+def budgeted(content, budget=BUDGET, count=SECTIONS):
+	if len(content) <= budget:
+		return regex(content), False
+
+	pieces = []
+	length = 0
+	truncated = False
+	for i, section in enumerate(sections(content)):
+		if i == count:
+			truncated = True
+			break
+		for chunk in chunks(section, CHUNK_SIZE):
+			cleaned = regex(chunk)
+			pieces.append(cleaned)
+			length += len(cleaned)
+			if length > budget:
+				truncated = True
+				break
+		if truncated:
+			break
+
+	filtered_content = EMPTY_LINES.sub('\n', ''.join(pieces))
+	if len(filtered_content) > budget:
+		end = filtered_content.rfind('\n', 0, budget)
+		filtered_content = filtered_content[:end if end > 0 else budget]
+	return filtered_content, truncated
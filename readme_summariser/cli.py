@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import logging
+
+START = time.perf_counter()
+
+from readme_summariser import lazy
+
+'''
+COMMANDS: module run for each command, only the chosen one is imported
+BUDGET: milliseconds the CLI may spend importing before the command starts
+LOG_LEVEL: level of the pipeline's progress messages, INFO by default so each fetch, tag & similar repo list is shown, the service defaults to WARNING
+'''
+COMMANDS = {
+	'single': 'readme_summariser.single',
+	'reporeaper': 'readme_summariser.reporeaper',
+	'repocounter': 'readme_summariser.repocounter',
+	'serve': 'readme_summariser.service',
+}
+BUDGET = float(os.environ.get('README_SUMMARISER_IMPORT_BUDGET', 150))
+LOG_LEVEL = os.environ.get('README_SUMMARISER_LOG_LEVEL', '')
+
+USAGE = '''usage: python -m readme_summariser [--import-times] [--metrics PATH] [--profile cprofile|sample] COMMAND [ARGS]
+
+commands:
+  single [URL]                       summarise one repo, asking for its URL if it is not given
+  reporeaper [page] [-a] [-o] [-H] [-A] [-g] [-i] [-f NAME]   harvest summaries of the reporeapers repos
+  repocounter [page] [-o] [-g] [-i] [-j N]   count the reporeapers repos with a README that can be summarised
+  serve [-p PORT] [-b HOST] [-u PATH] [-o]   answer summary requests over HTTP as JSON
+
+--import-times reports how long startup & every lazily imported module took
+--metrics PATH writes the stage timings, counters & slowest repos to PATH as JSON & next to it as Prometheus text (.prom) once the command ends
+--profile runs cProfile on the main thread or a sampling profiler over every thread, its profile is written next to the metrics (metrics.json if --metrics is not given)'''
+
+'''
+OPTIONS: global flags taking a value
+'''
+OPTIONS = ('--metrics', '--profile')
+
+'''
+report(startup)
+startup: seconds spent importing before the command started
+
+Prints the startup time against BUDGET & the time spent importing each module a stage loaded on demand
+'''
+def report(startup):
+	status = 'within' if startup * 1000 <= BUDGET else 'over'
+	print(f'startup: {startup * 1000:.1f}ms ({status} the {BUDGET:.0f}ms budget)', file=sys.stderr)
+	for name, seconds in sorted(lazy.IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True):
+		print(f'  {name}: {seconds * 1000:.1f}ms', file=sys.stderr)
+
+'''
+configureLogging(name)
+name: command being run
+
+The pipeline reports its progress through the readme_summariser loggers, the commands print these messages to stdout as they go
+while the service writes them to stderr with a timestamp & only from warnings up
+'''
+def configureLogging(name):
+	if name == 'serve':
+		logging.basicConfig(stream=sys.stderr, format='%(asctime)s %(name)s %(message)s')
+		level = LOG_LEVEL or 'WARNING'
+	else:
+		logging.basicConfig(stream=sys.stdout, format='%(message)s')
+		level = LOG_LEVEL or 'INFO'
+	logging.getLogger('readme_summariser').setLevel(level.upper())
+
+'''
+main(argv)
+argv: command line arguments, defaults to sys.argv without the program name
+
+Runs the chosen command, importing only the modules it needs
+
+Returns the exit status
+'''
+def main(argv=None):
+	if argv == None:
+		argv = sys.argv[1:]
+	timing = '--import-times' in argv
+	argv = [arg for arg in argv if arg != '--import-times']
+	options = {}
+	for option in OPTIONS:
+		if option in argv[:-1]:
+			i = argv.index(option)
+			options[option] = argv[i + 1]
+			argv = argv[:i] + argv[i + 2:]
+
+	if len(argv) == 0 or argv[0] not in COMMANDS:
+		print(USAGE, file=sys.stderr)
+		return 2
+
+	command = lazy.load(COMMANDS[argv[0]])
+	startup = time.perf_counter() - START
+	configureLogging(argv[0])
+
+	metrics = lazy.load('readme_summariser.metrics')
+	reportPath = options.get('--metrics', metrics.REPORT_PATH)
+	profile = options.get('--profile', metrics.PROFILER)
+	if profile not in metrics.PROFILERS:
+		print(USAGE, file=sys.stderr)
+		return 2
+	if profile != '' and reportPath == '':
+		reportPath = 'metrics.json'
+	metrics.startProfiling(profile)
+
+	try:
+		status = command.main(argv[1:])
+	finally:
+		if reportPath != '':
+			metrics.write(reportPath)
+			print('metrics written to ' + reportPath, file=sys.stderr)
+
+	if timing:
+		report(startup)
+	return status or 0
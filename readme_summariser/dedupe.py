@@ -0,0 +1,283 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from readme_summariser import lazy
+
+'''
+Settings for near-duplicate detection, each can be overridden from the environment
+
+DUPLICATES_PATH: location of the SQLite store of README signatures
+ENABLED: whether near-duplicate READMEs share summaries & are collapsed in similar repo sets
+THRESHOLD: estimated Jaccard similarity of two READMEs' shingles above which they are near-duplicates
+SHINGLE: number of words in a shingle
+SLOTS: number of values in a MinHash signature, 2 ** SLOT_BITS
+BANDS: number of LSH bands the signature is split into, SLOTS / BANDS rows each.
+16 bands of 8 rows make READMEs above ~0.7 similarity share a bucket almost always & READMEs below ~0.4 almost never
+'''
+DUPLICATES_PATH = os.environ.get('README_SUMMARISER_DUPLICATES', os.path.join(os.path.expanduser('~'), '.cache', 'readme_summariser', 'duplicates.sqlite'))
+ENABLED = os.environ.get('README_SUMMARISER_DEDUPE', '1') not in ('', '0')
+THRESHOLD = float(os.environ.get('README_SUMMARISER_DUPLICATE_THRESHOLD', 0.8))
+SHINGLE = 5
+SLOT_BITS = 7
+SLOTS = 2 ** SLOT_BITS
+BANDS = 16
+
+'''
+The shingles are hashed with one multiply-shift hash function, (a * x + b) mod 2**64 for a random odd a & random b.
+Its top SLOT_BITS bits pick the signature slot & the next 32 bits are the value, so a signature costs one hash per shingle rather than one per slot.
+a & b are drawn from SEED so they are the same on every run & stored signatures stay comparable
+'''
+SEED = 20181
+WORD_BASE = 0x01000193
+WORD_INVERSE = pow(WORD_BASE, -1, 2 ** 32)
+EMPTY = 0xffffffff
+
+duplicates = None
+coefficients = None
+powers = None
+
+'''
+Signatures of the most recent READMEs, as a README is usually checked, collapsed & added in quick succession
+'''
+recent = OrderedDict()
+recentLock = threading.Lock()
+RECENT_SIZE = 64
+
+'''
+getCoefficients()
+
+Draws the hash function coefficients on first use
+
+Returns a & b as NumPy uint64 values
+'''
+def getCoefficients():
+	global coefficients
+	if coefficients == None:
+		numpy = lazy.load('numpy')
+		generator = numpy.random.default_rng(SEED)
+		a, b = generator.integers(0, 2 ** 64 - 1, 2, dtype=numpy.uint64, endpoint=True)
+		coefficients = (a | numpy.uint64(1), b)
+	return coefficients
+
+'''
+getPowers(length)
+length: number of bytes to hash
+
+Builds the tables of WORD_BASE & WORD_INVERSE powers, doubling them whenever a longer text comes along
+
+Returns the two NumPy uint32 tables, each at least length long
+'''
+def getPowers(length):
+	global powers
+	if powers == None or len(powers[0]) < length:
+		numpy = lazy.load('numpy')
+		size = max(length, 2 * len(powers[0]) if powers != None else 65536)
+		tables = []
+		for base in (WORD_BASE, WORD_INVERSE):
+			table = numpy.full(size, base, dtype=numpy.uint32)
+			table[0] = 1
+			tables.append(numpy.cumprod(table, dtype=numpy.uint32))
+		powers = tuple(tables)
+	return powers
+
+'''
+shingles(content)
+content: cleaned README text
+
+Hashes every run of SHINGLE words without a Python loop.
+Each word's bytes are hashed as a polynomial in WORD_BASE: every byte is weighted by WORD_BASE ** position & a running sum is taken, so a word's hash is the difference of the sums at its ends divided by the power at its start (multiplying by the inverse of WORD_BASE, which exists mod 2**32 as it is odd).
+The shingle hashes are then combined from the word hashes, all arithmetic wrapping at 32 bits
+
+Returns a NumPy uint64 array of the shingle hashes, empty if the text has no words
+'''
+def shingles(content):
+	numpy = lazy.load('numpy')
+	data = numpy.frombuffer(content.lower().encode('utf-8'), dtype=numpy.uint8)
+	bases, inverses = getPowers(len(data))
+
+	inWord = numpy.zeros(len(data) + 2, dtype=numpy.int8)
+	inWord[1:-1] = data > 32
+	edges = numpy.flatnonzero(numpy.diff(inWord))
+	starts, ends = edges[0::2], edges[1::2]
+
+	sums = numpy.zeros(len(data) + 1, dtype=numpy.uint32)
+	numpy.cumsum(data * bases[:len(data)], dtype=numpy.uint32, out=sums[1:])
+	ids = (sums[ends] - sums[starts]) * inverses[starts]
+	if len(ids) < SHINGLE:
+		return ids.astype(numpy.uint64)
+
+	count = len(ids) - SHINGLE + 1
+	combined = ids[:count].copy()
+	for offset in range(1, SHINGLE):
+		combined *= numpy.uint32(1000003)
+		combined += ids[offset:offset + count]
+	return combined.astype(numpy.uint64)
+
+'''
+signature(content)
+content: cleaned README text
+
+One permutation MinHash: every slot keeps the smallest value of the shingles hashed into it.
+Empty slots, common in short READMEs, take the value of the next filled slot (wrapping round) plus a step per slot skipped, so two READMEs only agree on an empty slot when their neighbouring slots agree.
+The last RECENT_SIZE signatures are kept so they are not computed again
+
+Returns the signature as a NumPy uint32 array of SLOTS values, or an empty array if the text has no words
+'''
+def signature(content):
+	with recentLock:
+		if content in recent:
+			recent.move_to_end(content)
+			return recent[content]
+
+	numpy = lazy.load('numpy')
+	hashed = shingles(content)
+	sig = numpy.empty(0, dtype=numpy.uint32)
+	if len(hashed) > 0:
+		a, b = getCoefficients()
+		values = hashed * a
+		values += b
+		slots = (values >> numpy.uint64(64 - SLOT_BITS)).astype(numpy.intp)
+		values <<= numpy.uint64(SLOT_BITS)
+		sig = numpy.full(SLOTS, EMPTY, dtype=numpy.uint32)
+		numpy.minimum.at(sig, slots, (values >> numpy.uint64(32)).astype(numpy.uint32))
+
+		filled = numpy.flatnonzero(sig != EMPTY)
+		if len(filled) < SLOTS:
+			positions = numpy.arange(SLOTS)
+			following = filled[numpy.searchsorted(filled, positions) % len(filled)]
+			sig = sig[following] + (((following - positions) % SLOTS) * 0x9e3779b1).astype(numpy.uint32)
+
+	with recentLock:
+		recent[content] = sig
+		while len(recent) > RECENT_SIZE:
+			recent.popitem(last=False)
+	return sig
+
+'''
+similarity(first, second)
+first, second: MinHash signatures
+
+Returns the estimated Jaccard similarity of the two READMEs
+'''
+def similarity(first, second):
+	return float((first == second).mean())
+
+'''
+bands(sig)
+sig: MinHash signature
+
+Returns the LSH bucket keys of the signature, one per band
+'''
+def bands(sig):
+	rows = SLOTS // BANDS
+	return [(band, sig[band * rows:(band + 1) * rows].tobytes()) for band in range(BANDS)]
+
+'''
+DuplicateIndex(path)
+path: file location of the SQLite database, created if it does not exist
+
+MinHash signatures of every summarised README keyed by the hash of its cleaned text (the same hash the summary cache uses).
+The signatures are loaded into memory & bucketed by LSH band so a README's near-duplicates are found without comparing it to every other one
+'''
+class DuplicateIndex:
+	def __init__(self, path):
+		directory = os.path.dirname(path)
+		if directory != "":
+			os.makedirs(directory, exist_ok=True)
+
+		numpy = lazy.load('numpy')
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute('CREATE TABLE IF NOT EXISTS signatures (hash TEXT PRIMARY KEY, signature BLOB)')
+		self.db.commit()
+
+		self.signatures = {}
+		self.buckets = {}
+		for contentHash, blob in self.db.execute('SELECT hash, signature FROM signatures'):
+			self.remember(contentHash, numpy.frombuffer(blob, dtype=numpy.uint32))
+
+	'''
+	remember(contentHash, sig)
+
+	Adds the signature to the in-memory buckets
+	'''
+	def remember(self, contentHash, sig):
+		self.signatures[contentHash] = sig
+		for bucket in bands(sig):
+			self.buckets.setdefault(bucket, []).append(contentHash)
+
+	'''
+	find(sig, exclude)
+	sig: MinHash signature of a README
+	exclude: hash of a stored README that is never returned, e.g. the repo the README is a similar repo of
+
+	Returns the hash of the most similar stored README at or above THRESHOLD, or None if there is none
+	'''
+	def find(self, sig, exclude=None):
+		best = None
+		bestScore = THRESHOLD
+		with self.lock:
+			candidates = set()
+			for bucket in bands(sig):
+				candidates.update(self.buckets.get(bucket, ()))
+			candidates.discard(exclude)
+			for contentHash in candidates:
+				score = similarity(sig, self.signatures[contentHash])
+				if score >= bestScore:
+					best, bestScore = contentHash, score
+		return best
+
+	'''
+	add(contentHash, sig)
+	contentHash: hash of the cleaned README
+	sig: MinHash signature of the README
+
+	Stores the signature, a README already stored is left as it is
+	'''
+	def add(self, contentHash, sig):
+		with self.lock:
+			if contentHash in self.signatures:
+				return
+			self.remember(contentHash, sig)
+			self.db.execute('INSERT OR IGNORE INTO signatures (hash, signature) VALUES (?, ?)', (contentHash, sig.tobytes()))
+			self.db.commit()
+
+'''
+getDuplicates()
+
+Opens the duplicate index on first use
+
+Returns the shared DuplicateIndex object
+'''
+def getDuplicates():
+	global duplicates
+	if duplicates == None:
+		duplicates = DuplicateIndex(DUPLICATES_PATH)
+	return duplicates
+
+'''
+Distinct()
+
+Near-duplicate filter over READMEs given one at a time in ranking order, each is kept unless it is a near-duplicate of one kept before it
+'''
+class Distinct:
+	def __init__(self):
+		self.signatures = []
+
+	'''
+	keep(content)
+	content: cleaned README
+
+	READMEs without any words are always kept
+
+	Returns true if the README is not a near-duplicate of any README kept so far
+	'''
+	def keep(self, content):
+		sig = signature(content)
+		if len(sig) == 0:
+			return True
+		if any(similarity(sig, other) >= THRESHOLD for other in self.signatures):
+			return False
+		self.signatures.append(sig)
+		return True
@@ -0,0 +1,193 @@
+import os
+import time
+import base64
+import logging
+import hashlib
+import requests
+from readme_summariser.clean import budgeted
+from readme_summariser import fetch, summarise, lazy, metrics
+
+'''
+Settings for README fetching, each can be overridden from the environment
+
+MODE: 'raw' requests the README bytes as the raw media type & only falls back to the JSON contents response if that fails, 'json' always uses the JSON response
+MAX_SIZE: upper bound in bytes on the README text that is cleaned & summarised, longer READMEs are cut off
+'''
+MODE = os.environ.get('README_SUMMARISER_README_MODE', 'raw')
+MAX_SIZE = int(os.environ.get('README_SUMMARISER_MAX_README', 1024 * 1024))
+RAW = 'application/vnd.github.raw'
+
+log = logging.getLogger(__name__)
+
+'''
+decode(req)
+req: GitHub API request object
+
+De-JSON's the request object & extracts the string contents
+
+Returns a string of the webpage content
+'''
+def decode(req):
+	with metrics.span('decode'):
+		req = req.json()
+		content = base64.b64decode(req['content'])
+		content = str(content, "utf-8")
+	return content
+
+'''
+fetchText(URL)
+URL: API link to a repo's README
+
+Requests the README as the raw media type so its bytes are read straight from the response, at most MAX_SIZE of them.
+Falls back to decoding the JSON contents response if the raw request fails for any reason other than a 404
+
+Returns the HTTP status, the README text (None if it was not found) & whether the raw response was cut off at MAX_SIZE
+'''
+def fetchText(URL):
+	if MODE == 'raw':
+		req = fetch.get(URL, headers = {'Accept': RAW}, limit = MAX_SIZE)
+		if req.status_code == requests.codes.ok:
+			with metrics.span('decode'):
+				text = str(req.content, "utf-8", "ignore")
+			return req.status_code, text, fetch.TRUNCATED in req.headers
+		if req.status_code == requests.codes.not_found:
+			return req.status_code, None, False
+
+	req = fetch.get(URL)
+	if req.status_code == requests.codes.ok:
+		return req.status_code, decode(req), False
+	return req.status_code, None, False
+
+'''
+blobSHA(text)
+text: README text
+
+Hashes the text the way git hashes a blob, so it matches the sha GitHub reports for a UTF-8 README that was not cut off
+
+Returns the hex digest
+'''
+def blobSHA(text):
+	data = text.encode('utf-8')
+	digest = hashlib.sha1(b'blob %d\0' % len(data))
+	digest.update(data)
+	return digest.hexdigest()
+
+'''
+Document(URL, text, status)
+URL: API link to a repo's README
+text: raw README text that has already been fetched, e.g. by a GraphQL batch
+status: HTTP status the README was fetched with, the README is only requested if this is None
+
+Requests the README once (see fetchText) & strips uneccesary content, READMEs over the clean.BUDGET processing budget are cut down to their first sections.
+The README is only cleaned the first time its content is used, so a README known to be unchanged since it was last summarised is never cleaned.
+The cleaned text is kept so the sentence summary, README summary & topic stages all share the one request
+
+found: whether the request resolved
+status: HTTP status of the request, so a missing README (404) can be told apart from a request that failed
+text: raw README text, None if the request did not resolve
+content: cleaned README text, an empty string if the request did not resolve
+truncated: whether any of the README was left out, because it was over MAX_SIZE or the processing budget
+sha: git blob SHA of the README text, None if the request did not resolve
+topics: the repo's GitHub topics if they were fetched alongside the README, otherwise None & they are requested when needed
+elapsed: seconds spent fetching the README, 0 if its text was given
+'''
+class Document:
+	def __init__(self, URL, text=None, status=None):
+		self.URL = URL
+		self.found = False
+		self.text = None
+		self.summary = None
+		self.topics = None
+		self.cleaned = None
+		self.hashed = None
+		self.cut = False
+		self.elapsed = 0
+
+		if status == None:
+			start = time.perf_counter()
+			status, text, self.cut = fetchText(URL)
+			self.elapsed = time.perf_counter() - start
+			metrics.record('readme', self.elapsed)
+		self.status = status
+		if status == requests.codes.ok:
+			self.found = True
+			if len(text) > MAX_SIZE:
+				text = text[:MAX_SIZE]
+				self.cut = True
+			self.text = text
+
+	'''
+	clean()
+
+	Cleans the README within the processing budget on the first call
+
+	Returns the cleaned text & whether any of the README was left out
+	'''
+	def clean(self):
+		if self.cleaned == None:
+			if self.found:
+				with metrics.span('regex'):
+					content, cut = budgeted(self.text.lower())
+				self.cleaned = (content, self.cut or cut)
+			else:
+				self.cleaned = ("", False)
+		return self.cleaned
+
+	@property
+	def content(self):
+		return self.clean()[0]
+
+	@property
+	def truncated(self):
+		return self.clean()[1]
+
+	@property
+	def sha(self):
+		if self.hashed == None and self.found:
+			self.hashed = blobSHA(self.text)
+		return self.hashed
+
+	'''
+	sentences(count)
+	count: number of sentences to keep
+
+	Returns the first count sentences of the cleaned README joined into a single string
+	'''
+	def sentences(self, count):
+		content = self.content
+		with metrics.span('sent_tokenize'):
+			return " ".join(lazy.load('nltk.tokenize').sent_tokenize(content)[:count])
+
+	'''
+	summarise()
+
+	Summarises the cleaned README through the summary cache, the summary is only looked up on the first call
+
+	Returns the README summary
+	'''
+	def summarise(self):
+		if self.summary == None:
+			self.summary = summarise.summarise(self.content)
+		return self.summary
+
+'''
+contentPrint(bool, URL)
+bool: whether the content received is summarised
+URL: URL of GitHub repo
+
+Requests the GitHub repo, using the returned value, the content is decoded from base64 & uneccesary content is stripped.
+Resultant text can be summarised through the summary cache
+
+Returns repo content|summary, if the request does not resolve an empty string is returned
+'''
+def contentPrint(bool, URL):
+	document = Document(URL)
+
+	if document.found:
+		if bool == True:
+			return document.summarise()
+		return document.content
+
+	else:
+		log.info('Content of %s was not found', URL)
+		return ""
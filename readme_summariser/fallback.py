@@ -0,0 +1,51 @@
+from readme_summariser import lazy
+
+'''
+Fallbacks used to suggest candidate topics for a repo that has no GitHub topics.
+Each takes the repo summary & returns a list of candidate topic strings, which are then ranked like GitHub topics
+'''
+
+'''
+prompt(filtered_content)
+filtered_content: repo summary
+
+Asks the user for topics until they enter 'exit'
+
+Returns the list of topics entered
+'''
+def prompt(filtered_content):
+	content = []
+	currContent = ""
+
+	while currContent != "exit":
+		currContent = input("Enter a topic for this repo or 'exit' to submit current suggestions: ")
+		content.append(currContent)
+	content.remove("exit")
+
+	return content
+
+'''
+rake(filtered_content)
+filtered_content: repo summary
+
+Applies RAKE on the summary to find keywords without any user input
+
+Returns up to 5 of the highest ranked key phrases
+'''
+def rake(filtered_content):
+	r = lazy.load('rake_nltk').Rake()
+	r.extract_keywords_from_text(filtered_content)
+	return r.get_ranked_phrases()[:5]
+
+'''
+none(filtered_content)
+filtered_content: repo summary
+
+Skips topic selection for repos without GitHub topics
+
+Returns an empty list
+'''
+def none(filtered_content):
+	return []
+
+FALLBACKS = {'prompt': prompt, 'rake': rake, 'none': none}
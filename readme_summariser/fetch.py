@@ -0,0 +1,287 @@
+import os
+import time
+import hashlib
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from readme_summariser.cache import Cache
+from readme_summariser.scheduler import Scheduler, resource as rateResource
+from readme_summariser import metrics
+
+'''
+Settings for the shared fetch layer, each can be overridden from the environment or with configure()
+
+CACHE_PATH: location of the SQLite response cache
+TTL: seconds a cached response is served without revalidating it
+MAX_SIZE: upper bound in bytes on the cached response bodies
+OFFLINE: if true, only cached responses are served & the network is never used
+TOKENS: GitHub OAuth tokens requests are spread across, only sent to api.github.com. Read from GITHUB_TOKENS (comma separated) or GITHUB_TOKEN
+POOL_SIZE: number of keep-alive connections kept open per host
+RETRIES: number of times a request failing with a 5xx status is retried with exponential backoff
+'''
+CACHE_PATH = os.environ.get('README_SUMMARISER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'readme_summariser', 'http.sqlite'))
+TTL = int(os.environ.get('README_SUMMARISER_TTL', 24 * 60 * 60))
+MAX_SIZE = int(os.environ.get('README_SUMMARISER_MAX_SIZE', 512 * 1024 * 1024))
+OFFLINE = os.environ.get('README_SUMMARISER_OFFLINE', '') not in ('', '0')
+TOKENS = [token for token in os.environ.get('GITHUB_TOKENS', os.environ.get('GITHUB_TOKEN', '')).split(',') if token != '']
+POOL_SIZE = int(os.environ.get('README_SUMMARISER_POOL', 16))
+RETRIES = int(os.environ.get('README_SUMMARISER_RETRIES', 5))
+
+'''
+CHUNK_SIZE: bytes read at a time when a body is streamed
+TRUNCATED: header added to a response whose body was cut off at a size limit, set to the limit
+'''
+CHUNK_SIZE = 64 * 1024
+TRUNCATED = 'X-Readme-Summariser-Truncated'
+
+cache = None
+session = None
+
+'''
+Rate limit schedulers, api.github.com requests are sent with the tokens & all other requests are sent anonymously
+'''
+schedulers = {}
+schedulerLock = threading.Lock()
+
+'''
+configure(path, ttl, maxSize, offline, tokens)
+path: location of the SQLite response cache
+ttl: seconds a cached response is served without revalidating it
+maxSize: upper bound in bytes on the cached response bodies
+offline: whether to serve from the cache only
+tokens: list of GitHub OAuth tokens
+
+Changes the fetch settings, any argument left as None keeps its current value
+'''
+def configure(path=None, ttl=None, maxSize=None, offline=None, tokens=None):
+	global CACHE_PATH, TTL, MAX_SIZE, OFFLINE, TOKENS, cache
+
+	if path != None:
+		CACHE_PATH = path
+		cache = None
+	if ttl != None:
+		TTL = ttl
+	if maxSize != None:
+		MAX_SIZE = maxSize
+		if cache != None:
+			cache.maxSize = maxSize
+	if offline != None:
+		OFFLINE = offline
+	if tokens != None:
+		TOKENS = list(tokens)
+		with schedulerLock:
+			schedulers.clear()
+
+'''
+getCache()
+
+Opens the response cache on first use
+
+Returns the shared Cache object
+'''
+def getCache():
+	global cache
+	if cache == None:
+		cache = Cache(CACHE_PATH, MAX_SIZE)
+	return cache
+
+'''
+getSession()
+
+Creates the shared keep-alive session on first use.
+Its connection pools are sized for the crawler threads & requests failing with a 5xx status are retried with exponential backoff
+
+Returns the shared requests Session
+'''
+def getSession():
+	global session
+	if session == None:
+		retries = Retry(total=RETRIES, backoff_factor=1, status_forcelist=(500, 502, 503, 504), raise_on_status=False)
+		adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries)
+		session = requests.Session()
+		session.mount('https://', adapter)
+		session.mount('http://', adapter)
+	return session
+
+'''
+response(URL, status, headers, body)
+URL: request URL
+status: HTTP status code
+headers: dict of response headers
+body: bytes of the response body
+
+Builds a requests Response so cached entries can be used by the same code as live ones
+
+Returns the Response object
+'''
+def response(URL, status, headers, body):
+	resp = requests.models.Response()
+	resp.url = URL
+	resp.status_code = status
+	resp.headers = CaseInsensitiveDict(headers)
+	resp._content = body
+	resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+	return resp
+
+'''
+getScheduler(URL)
+URL: request URL
+
+Creates the rate limit scheduler for the URL's host on first use
+
+Returns the Scheduler for api.github.com, or the anonymous one for any other URL
+'''
+def getScheduler(URL):
+	api = URL.startswith('https://api.github.com/')
+	with schedulerLock:
+		if api not in schedulers:
+			schedulers[api] = Scheduler(TOKENS if api else [])
+		return schedulers[api]
+
+'''
+send(URL, headers, data, stream)
+URL: request URL
+headers: dict of request headers
+data: bytes of a POST body, the request is a GET if it is None
+stream: whether to leave the body unread so it can be streamed
+
+Sends the request through the URL's rate limit scheduler against the quota of its resource (core, graphql or search), retrying it for as long as it is rate limited.
+Every response is counted by host & status
+
+Returns a requests Response object
+'''
+def send(URL, headers, data=None, stream=False):
+	scheduler = getScheduler(URL)
+	host = urlsplit(URL).hostname
+	resource = rateResource(URL)
+	attempt = 0
+	while True:
+		with metrics.span('rate_wait'):
+			token = scheduler.acquire(resource)
+		if token.value != '':
+			headers['Authorization'] = 'token ' + token.value
+		if data == None:
+			req = getSession().get(URL, headers=headers, stream=stream)
+		else:
+			req = getSession().post(URL, headers=headers, data=data)
+		metrics.count('http_requests', host=host, status=str(req.status_code))
+		if not scheduler.update(token, req, attempt, resource):
+			return req
+		metrics.count('rate_limited', host=host)
+		req.close()
+		attempt += 1
+
+'''
+read(req, limit)
+req: streamed requests Response object with its body unread
+limit: upper bound in bytes on the body
+
+Reads at most limit bytes of the body into the response & closes its connection, marking the response with the TRUNCATED header if the body was longer
+'''
+def read(req, limit):
+	body = bytearray()
+	for chunk in req.iter_content(CHUNK_SIZE):
+		body += chunk
+		if len(body) > limit:
+			req.headers[TRUNCATED] = str(limit)
+			del body[limit:]
+			break
+	req.close()
+	req._content = bytes(body)
+
+'''
+get(URL, headers, ttl, limit)
+URL: request URL
+headers: dict of extra request headers
+ttl: seconds a cached response is served without revalidating it, defaults to TTL
+limit: upper bound in bytes on the body, the body is streamed & only the first limit bytes are read. Truncated responses carry the TRUNCATED header
+
+Requests the URL through the response cache, entries are keyed by the URL, any Accept header & any limit.
+A fresh cached response is returned without using the network, a stale one is revalidated with If-None-Match/If-Modified-Since.
+GitHub does not count 304 Not Modified responses against the rate limit, so revalidating is close to free.
+In offline mode a cache miss gives a 504 response.
+Every request goes through a rate limit scheduler, which paces it, picks the token it is sent with (api.github.com only) & retries it once the quota resets rather than failing.
+All requests share one keep-alive session.
+Cache results, network time & bytes received are recorded in metrics
+
+Returns a requests Response object
+'''
+def get(URL, headers=None, ttl=None, limit=None):
+	if ttl == None:
+		ttl = TTL
+	headers = dict(headers or {})
+	key = URL
+	if 'Accept' in headers:
+		key = URL + ' ' + headers['Accept']
+	if limit != None:
+		key += ' ' + str(limit)
+	store = getCache()
+	cached = store.get(key)
+
+	if cached != None and (OFFLINE or time.time() - cached['fetched'] < ttl):
+		metrics.count('http_cache', result='fresh')
+		return response(URL, cached['status'], cached['headers'], cached['body'])
+	if OFFLINE:
+		metrics.count('http_cache', result='offline')
+		return response(URL, 504, {}, b'')
+
+	if cached != None:
+		if cached['etag'] != None:
+			headers['If-None-Match'] = cached['etag']
+		if cached['modified'] != None:
+			headers['If-Modified-Since'] = cached['modified']
+
+	with metrics.span('http'):
+		req = send(URL, headers, stream=limit != None)
+		if limit != None and req.status_code == requests.codes.ok:
+			read(req, limit)
+		metrics.count('bytes_fetched', len(req.content))
+
+	if req.status_code == requests.codes.not_modified and cached != None:
+		metrics.count('http_cache', result='revalidated')
+		store.touch(key)
+		return response(URL, cached['status'], cached['headers'], cached['body'])
+	metrics.count('http_cache', result='miss' if cached == None else 'refetched')
+	if req.status_code == requests.codes.ok:
+		store.put(key, req.status_code, dict(req.headers), req.content)
+	return req
+
+'''
+post(URL, data, headers, ttl, keep)
+URL: request URL
+data: bytes of the request body
+headers: dict of extra request headers
+ttl: seconds a cached response is served again, defaults to TTL
+keep: function deciding whether a 200 response is cached, every 200 response is cached if None
+
+Posts the body through the response cache, entries are keyed by the URL & a hash of the body.
+POST responses carry no validators, so a cached response is served until it is ttl seconds old & then the body is sent again.
+In offline mode a cache miss gives a 504 response
+
+Returns a requests Response object
+'''
+def post(URL, data, headers=None, ttl=None, keep=None):
+	if ttl == None:
+		ttl = TTL
+	headers = dict(headers or {})
+	key = URL + ' ' + hashlib.sha1(data).hexdigest()
+	store = getCache()
+	cached = store.get(key)
+
+	if cached != None and (OFFLINE or time.time() - cached['fetched'] < ttl):
+		metrics.count('http_cache', result='fresh')
+		return response(URL, cached['status'], cached['headers'], cached['body'])
+	if OFFLINE:
+		metrics.count('http_cache', result='offline')
+		return response(URL, 504, {}, b'')
+
+	with metrics.span('http'):
+		req = send(URL, headers, data)
+		metrics.count('bytes_fetched', len(req.content))
+	metrics.count('http_cache', result='miss' if cached == None else 'refetched')
+	if req.status_code == requests.codes.ok and (keep == None or keep(req)):
+		store.put(key, req.status_code, dict(req.headers), req.content)
+	return req
@@ -0,0 +1,102 @@
+import os
+import json
+import requests
+from readme_summariser import fetch
+from readme_summariser.document import Document
+
+'''
+Settings for GraphQL batch fetching, each can be overridden from the environment
+
+GRAPHQL_URL: GraphQL endpoint, point it at a local stub server to run without GitHub
+BATCH_SIZE: number of repos fetched by each query
+TOPIC_COUNT: number of GitHub topics fetched for each repo
+'''
+GRAPHQL_URL = os.environ.get('README_SUMMARISER_GRAPHQL', 'https://api.github.com/graphql')
+BATCH_SIZE = int(os.environ.get('README_SUMMARISER_GRAPHQL_BATCH', 50))
+TOPIC_COUNT = 20
+
+'''
+query(repos)
+repos: list of repo ID's ('owner/repo')
+
+Builds one query asking for the README text & topics of every repo, each repo is aliased by its position (r0, r1, ...)
+
+Returns the query string
+'''
+def query(repos):
+	parts = []
+	for i, repo in enumerate(repos):
+		owner, name = repo.split('/', 1)
+		parts.append(f'''  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{
+    readme: object(expression: "HEAD:README.md") {{ ... on Blob {{ text isTruncated }} }}
+    repositoryTopics(first: {TOPIC_COUNT}) {{ nodes {{ topic {{ name }} }} }}
+  }}''')
+	return 'query {\n' + '\n'.join(parts) + '\n}'
+
+'''
+fetchMany(repos)
+repos: list of repo ID's, at most BATCH_SIZE of them
+
+Fetches the README text & topics of the repos in one GraphQL request through the response cache, replies carrying errors are not cached so the repos are asked for again next time
+
+Returns a dict of repo ID to a dict of
+status: 200 if the README text was fetched, 404 if the repo or its README does not exist, None if the README has to be requested over REST (binary or truncated blobs)
+text: raw README text or None
+topics: list of the repo's GitHub topics or None
+Repos the query failed for are left out so they can be requested over REST
+'''
+def fetchMany(repos):
+	body = json.dumps({'query': query(repos)}).encode('utf-8')
+	req = fetch.post(GRAPHQL_URL, body, {'Content-Type': 'application/json'}, keep=lambda req: not req.json().get('errors'))
+	if req.status_code != requests.codes.ok:
+		return {}
+	reply = req.json()
+
+	'''
+	Repos missing because of an error other than NOT_FOUND (e.g. a timeout) are retried over REST
+	'''
+	failed = set()
+	for error in reply.get('errors') or []:
+		if error.get('type') != 'NOT_FOUND' and error.get('path'):
+			failed.add(error['path'][0])
+
+	data = reply.get('data') or {}
+	results = {}
+	for i, repo in enumerate(repos):
+		alias = f'r{i}'
+		if alias not in data or alias in failed:
+			continue
+		node = data[alias]
+		if node == None:
+			results[repo] = {'status': requests.codes.not_found, 'text': None, 'topics': None}
+			continue
+
+		topics = [item['topic']['name'] for item in node['repositoryTopics']['nodes']]
+		blob = node['readme']
+		if blob == None:
+			results[repo] = {'status': requests.codes.not_found, 'text': None, 'topics': topics}
+		elif blob.get('text') == None or blob.get('isTruncated'):
+			results[repo] = {'status': None, 'text': None, 'topics': topics}
+		else:
+			results[repo] = {'status': requests.codes.ok, 'text': blob['text'], 'topics': topics}
+	return results
+
+'''
+fetchDocuments(repos)
+repos: list of repo ID's
+
+Fetches the READMEs & topics of the repos BATCH_SIZE at a time, repos the batch could not answer are requested over REST
+
+Returns a dict of repo ID to its README Document, with its topics set if they were fetched
+'''
+def fetchDocuments(repos):
+	documents = {}
+	for start in range(0, len(repos), BATCH_SIZE):
+		batch = repos[start:start + BATCH_SIZE]
+		results = fetchMany(batch)
+		for repo in batch:
+			result = results.get(repo, {'status': None, 'text': None, 'topics': None})
+			document = Document(f'https://api.github.com/repos/{repo}/contents/README.md', result['text'], result['status'])
+			document.topics = result['topics']
+			documents[repo] = document
+	return documents
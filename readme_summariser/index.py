@@ -0,0 +1,108 @@
+import os
+import time
+import sqlite3
+import threading
+
+'''
+Settings for the topic index, each can be overridden from the environment
+
+INDEX_PATH: location of the SQLite topic index
+TTL: seconds a scraped topic or search page ranking is trusted before it is scraped again
+'''
+INDEX_PATH = os.environ.get('README_SUMMARISER_INDEX', os.path.join(os.path.expanduser('~'), '.cache', 'readme_summariser', 'index.sqlite'))
+TTL = int(os.environ.get('README_SUMMARISER_INDEX_TTL', 7 * 24 * 60 * 60))
+
+index = None
+
+'''
+TopicIndex(path)
+path: file location of the SQLite database, created if it does not exist
+
+Persistent map of topic or search term to a ranked list of repo paths ('/owner/repo'), built from two sources
+ranked: the order repos were listed in on a scraped github.com/topics or github.com/search page
+tagged: the topics returned by the /topics API for every repo the crawler has already visited
+'''
+class TopicIndex:
+	def __init__(self, path):
+		directory = os.path.dirname(path)
+		if directory != "":
+			os.makedirs(directory, exist_ok=True)
+
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute('CREATE TABLE IF NOT EXISTS ranked (term TEXT, position INTEGER, repo TEXT, updated REAL, PRIMARY KEY (term, repo))')
+		self.db.execute('CREATE TABLE IF NOT EXISTS tagged (topic TEXT, repo TEXT, seen REAL, PRIMARY KEY (topic, repo))')
+		self.db.commit()
+
+	'''
+	addRanking(term, repos)
+	term: topic or search term the page was scraped for
+	repos: list of repo paths in the order GitHub listed them
+
+	Replaces the stored ranking of the term
+	'''
+	def addRanking(self, term, repos):
+		term = normalise(term)
+		now = time.time()
+		with self.lock:
+			self.db.execute('DELETE FROM ranked WHERE term = ?', (term,))
+			self.db.executemany('INSERT OR IGNORE INTO ranked VALUES (?, ?, ?, ?)', [(term, i, repo, now) for i, repo in enumerate(repos)])
+			self.db.commit()
+
+	'''
+	addTopics(repo, topics)
+	repo: repo path
+	topics: list of the repo's GitHub topics
+
+	Records the repo under each of its topics, keeping the time it was first seen
+	'''
+	def addTopics(self, repo, topics):
+		now = time.time()
+		with self.lock:
+			self.db.executemany('INSERT OR IGNORE INTO tagged VALUES (?, ?, ?)', [(normalise(topic), repo, now) for topic in topics])
+			self.db.commit()
+
+	'''
+	similar(term, count, exclude)
+	term: topic or search term
+	count: number of repos wanted
+	exclude: repo path left out of the results, normally the repo the similar repos are for
+
+	A scraped ranking younger than TTL is used first.
+	Otherwise the repos tagged with the topic are used in the order they were crawled, as long as there are at least count of them
+
+	Returns a list of up to count repo paths or None if the index cannot answer
+	'''
+	def similar(self, term, count, exclude=None):
+		term = normalise(term)
+		with self.lock:
+			repos = [row[0] for row in self.db.execute('SELECT repo FROM ranked WHERE term = ? AND updated > ? ORDER BY position', (term, time.time() - TTL))]
+			if len(repos) == 0:
+				repos = [row[0] for row in self.db.execute('SELECT repo FROM tagged WHERE topic = ? ORDER BY seen', (term,))]
+				repos = [repo for repo in repos if repo != exclude]
+				if len(repos) < count:
+					return None
+
+		return [repo for repo in repos if repo != exclude][:count]
+
+'''
+normalise(term)
+term: topic or search term
+
+Returns the term lowercased & stripped of surrounding whitespace
+'''
+def normalise(term):
+	return term.strip().lower()
+
+'''
+getIndex()
+
+Opens the topic index on first use
+
+Returns the shared TopicIndex object
+'''
+def getIndex():
+	global index
+	if index == None:
+		index = TopicIndex(INDEX_PATH)
+	return index
@@ -0,0 +1,24 @@
+import time
+import importlib
+
+'''
+Heavy modules (nltk, summa, numpy, scipy, rake_nltk, textdistance) are only imported once a stage needs them.
+The seconds spent on each import are kept in IMPORT_TIMES so the CLI can report them
+'''
+IMPORT_TIMES = {}
+
+'''
+load(name)
+name: dotted module name
+
+Imports the module on first use, timing how long the import took
+
+Returns the module
+'''
+def load(name):
+	if name not in IMPORT_TIMES:
+		start = time.perf_counter()
+		module = importlib.import_module(name)
+		IMPORT_TIMES[name] = time.perf_counter() - start
+		return module
+	return importlib.import_module(name)
@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import time
+import heapq
+import bisect
+import threading
+from collections import deque, Counter
+from contextlib import contextmanager
+from readme_summariser import lazy
+
+'''
+Settings for pipeline instrumentation, each can be overridden from the environment or the command line
+
+REPORT_PATH: path the JSON report is written to at the end of a batch, the Prometheus text is written next to it (.prom). No report is written if empty
+PROFILER: profiler run during the batch, 'cprofile' (the main thread, written to .pstats), 'sample' (every thread, written to .folded for flame graphs) or '' for none
+SAMPLE_INTERVAL: seconds between the sampling profiler's stack samples
+SLOWEST: number of the slowest repos whose stage times are kept
+SAMPLES: number of the most recent durations of each stage kept for its percentiles
+BUCKETS: upper bounds in seconds of the Prometheus stage histogram buckets
+'''
+REPORT_PATH = os.environ.get('README_SUMMARISER_METRICS', '')
+PROFILER = os.environ.get('README_SUMMARISER_PROFILE', '')
+SAMPLE_INTERVAL = float(os.environ.get('README_SUMMARISER_SAMPLE_INTERVAL', 0.005))
+SLOWEST = 20
+SAMPLES = 1024
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+
+PREFIX = 'readme_summariser_'
+PROFILERS = ('', 'cprofile', 'sample')
+
+'''
+Stages timed by span, nested spans are also counted in the stage around them (findSimilar includes the http of the similar READMEs)
+readme: fetching a README for a Document, including its http & decode
+http: waiting on the network, from sending a request to reading its body
+rate_wait: waiting for a rate limit token
+decode: decoding a README response
+regex: cleaning a README within the processing budget
+sent_tokenize: splitting the sentence summary
+summarize: summarising READMEs in this process (summaries made in worker processes are part of findSimilar)
+topics: scoring the topics of a repo
+topicReq, searchReq: scraping a topic or search page
+findSimilar: finding, fetching & summarising the similar repos
+combine: ranking the similar repo summaries together
+
+COUNTERS: description of every counter, used as its Prometheus help text
+'''
+COUNTERS = {
+	'http_requests': 'HTTP responses received, by host & status',
+	'http_cache': 'Response cache lookups, by result (fresh, revalidated, refetched, miss, offline)',
+	'bytes_fetched': 'Response body bytes received from the network',
+	'rate_limited': 'Rate limited responses retried, by host',
+	'summary_cache': 'Summary cache lookups, by result (hit, duplicate, miss)',
+	'harvest_state': 'Incremental harvest lookups, by result (unchanged, changed)',
+}
+
+profiler = None
+
+'''
+Metrics()
+
+Thread safe store of stage timings, counters & the slowest repo traces.
+A trace collects the time spent in each stage by the thread working on one repo, spans on other threads (the similar READMEs' fetches) only count towards the totals
+'''
+class Metrics:
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.local = threading.local()
+		self.reset()
+
+	'''
+	reset()
+
+	Drops everything recorded so far, e.g. at the start of a batch
+	'''
+	def reset(self):
+		with self.lock:
+			self.started = time.time()
+			self.stages = {}
+			self.counters = {}
+			self.slowest = []
+			self.traced = 0
+
+	'''
+	span(name)
+	name: stage name
+
+	Context manager timing the code inside it as one run of the stage
+	'''
+	@contextmanager
+	def span(self, name):
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(name, time.perf_counter() - start)
+
+	'''
+	record(name, seconds)
+	name: stage name
+	seconds: duration of one run of the stage
+
+	Adds the duration to the stage & to the trace of the thread's current repo
+	'''
+	def record(self, name, seconds):
+		trace = getattr(self.local, 'trace', None)
+		if trace != None:
+			trace[name] = trace.get(name, 0) + seconds
+
+		with self.lock:
+			stage = self.stages.get(name)
+			if stage == None:
+				stage = self.stages[name] = {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': [0] * (len(BUCKETS) + 1), 'recent': deque(maxlen=SAMPLES)}
+			stage['count'] += 1
+			stage['total'] += seconds
+			stage['max'] = max(stage['max'], seconds)
+			stage['buckets'][bisect.bisect_left(BUCKETS, seconds)] += 1
+			stage['recent'].append(seconds)
+
+	'''
+	count(name, amount, labels)
+	name: counter name, one of COUNTERS
+	amount: amount added
+	labels: keyword arguments labelling the count, e.g. status='200'
+	'''
+	def count(self, name, amount=1, **labels):
+		key = (name, tuple(sorted(labels.items())))
+		with self.lock:
+			self.counters[key] = self.counters.get(key, 0) + amount
+
+	'''
+	trace(repo, stages)
+	repo: repo ID
+	stages: dict of stage times already spent on the repo, e.g. fetching its README before the trace started
+
+	Context manager collecting the stage times of the repo's thread, the SLOWEST repos are kept with their stage times.
+	A trace started inside another one is part of the outer trace
+	'''
+	@contextmanager
+	def trace(self, repo, stages=None):
+		if getattr(self.local, 'trace', None) != None:
+			yield
+			return
+
+		trace = dict(stages or {})
+		self.local.trace = trace
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			seconds = time.perf_counter() - start + sum((stages or {}).values())
+			self.local.trace = None
+			with self.lock:
+				self.traced += 1
+				entry = (seconds, self.traced, repo, trace)
+				if len(self.slowest) < SLOWEST:
+					heapq.heappush(self.slowest, entry)
+				else:
+					heapq.heappushpop(self.slowest, entry)
+
+	'''
+	report()
+
+	Returns a dict of the elapsed seconds, every stage's count, total, mean, max, p50 & p99 seconds, every counter & the slowest repos with their stage times
+	'''
+	def report(self):
+		with self.lock:
+			stages = {}
+			for name, stage in sorted(self.stages.items()):
+				recent = sorted(stage['recent'])
+				stages[name] = {
+					'count': stage['count'],
+					'total': stage['total'],
+					'mean': stage['total'] / stage['count'],
+					'max': stage['max'],
+					'p50': recent[max(0, (len(recent) + 1) // 2 - 1)],
+					'p99': recent[max(0, -(-len(recent) * 99 // 100) - 1)],
+				}
+
+			counters = {}
+			for (name, labels), value in sorted(self.counters.items()):
+				counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+
+			slowest = [{'repo': repo, 'seconds': seconds, 'stages': trace} for seconds, _, repo, trace in sorted(self.slowest, reverse=True)]
+			return {'started': self.started, 'elapsed': time.time() - self.started, 'repos': self.traced, 'stages': stages, 'counters': counters, 'slowest': slowest}
+
+	'''
+	prometheus()
+
+	Returns the stage timings as a histogram & every counter in the Prometheus text exposition format
+	'''
+	def prometheus(self):
+		lines = [
+			f'# HELP {PREFIX}stage_seconds Seconds spent in each pipeline stage',
+			f'# TYPE {PREFIX}stage_seconds histogram',
+		]
+		with self.lock:
+			for name, stage in sorted(self.stages.items()):
+				cumulative = 0
+				for bound, count in zip(BUCKETS + ('+Inf',), stage['buckets']):
+					cumulative += count
+					lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{escape(name)}",le="{bound}"}} {cumulative}')
+				lines.append(f'{PREFIX}stage_seconds_sum{{stage="{escape(name)}"}} {stage["total"]}')
+				lines.append(f'{PREFIX}stage_seconds_count{{stage="{escape(name)}"}} {stage["count"]}')
+
+			lines.append(f'# HELP {PREFIX}repos_total Repos traced')
+			lines.append(f'# TYPE {PREFIX}repos_total counter')
+			lines.append(f'{PREFIX}repos_total {self.traced}')
+
+			names = sorted(set(name for name, labels in self.counters))
+			for name in names:
+				lines.append(f'# HELP {PREFIX}{name}_total {COUNTERS.get(name, name)}')
+				lines.append(f'# TYPE {PREFIX}{name}_total counter')
+				for (counter, labels), value in sorted(self.counters.items()):
+					if counter == name:
+						labelText = ','.join(f'{key}="{escape(str(label))}"' for key, label in labels)
+						lines.append(f'{PREFIX}{name}_total' + (f'{{{labelText}}}' if labelText else '') + f' {value}')
+		return '\n'.join(lines) + '\n'
+
+'''
+escape(value)
+value: Prometheus label value
+
+Returns the value with backslashes, quotes & newlines escaped
+'''
+def escape(value):
+	return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+'''
+The metrics of this process, recorded through the functions below
+'''
+collector = Metrics()
+
+def span(name):
+	return collector.span(name)
+
+def record(name, seconds):
+	collector.record(name, seconds)
+
+def count(name, amount=1, **labels):
+	collector.count(name, amount, **labels)
+
+def trace(repo, stages=None):
+	return collector.trace(repo, stages)
+
+'''
+Sampler(interval)
+interval: seconds between samples
+
+Sampling profiler, a background thread records the call stack of every other thread each interval.
+The stacks are kept collapsed ('outer;inner;innermost'), the input format of flame graph tools
+'''
+class Sampler:
+	def __init__(self, interval):
+		self.interval = interval
+		self.stacks = Counter()
+		self.samples = 0
+		self.stopped = threading.Event()
+		self.thread = threading.Thread(target=self.run, daemon=True)
+
+	def start(self):
+		self.thread.start()
+
+	def stop(self):
+		self.stopped.set()
+		self.thread.join()
+
+	'''
+	run()
+
+	Samples the stacks until stopped
+	'''
+	def run(self):
+		own = threading.get_ident()
+		while not self.stopped.wait(self.interval):
+			for ident, frame in sys._current_frames().items():
+				if ident == own:
+					continue
+				stack = []
+				while frame != None:
+					stack.append(f'{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})')
+					frame = frame.f_back
+				self.stacks[';'.join(reversed(stack))] += 1
+			self.samples += 1
+
+	'''
+	write(path)
+	path: file the collapsed stacks are written to, one 'stack count' line each
+
+	Returns the functions most often at the top of the stack, with their share of the samples
+	'''
+	def write(self, path):
+		with open(path, 'w') as f:
+			for stack, samples in self.stacks.most_common():
+				f.write(f'{stack} {samples}\n')
+
+		total = sum(self.stacks.values()) or 1
+		leaves = Counter()
+		for stack, samples in self.stacks.items():
+			leaves[stack.rsplit(';', 1)[-1]] += samples
+		return [{'function': function, 'share': samples / total} for function, samples in leaves.most_common(SLOWEST)]
+
+'''
+startProfiling(kind)
+kind: 'cprofile', 'sample' or '' for none, defaults to PROFILER
+
+Starts the profiler, cProfile only sees the thread that starts it
+'''
+def startProfiling(kind=None):
+	global profiler
+	kind = PROFILER if kind == None else kind
+	if kind == 'cprofile':
+		profiler = ('cprofile', lazy.load('cProfile').Profile())
+		profiler[1].enable()
+	elif kind == 'sample':
+		profiler = ('sample', Sampler(SAMPLE_INTERVAL))
+		profiler[1].start()
+	elif kind not in PROFILERS:
+		raise ValueError(f'unknown profiler {kind}')
+
+'''
+stopProfiling(base)
+base: path the profile is written to without its extension
+
+Stops the profiler if one is running & writes its profile to base.pstats or base.folded
+
+Returns a dict of the profiler, its file & its top functions, or None if no profiler was running
+'''
+def stopProfiling(base):
+	global profiler
+	if profiler == None:
+		return None
+	kind, running = profiler
+	profiler = None
+
+	if kind == 'cprofile':
+		running.disable()
+		path = base + '.pstats'
+		running.dump_stats(path)
+		stats = lazy.load('pstats').Stats(running).stats
+		ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:SLOWEST]
+		top = [{'function': f'{function} ({os.path.basename(filename)}:{line})', 'calls': calls, 'self': own, 'cumulative': cumulative} for (filename, line, function), (_, calls, own, cumulative, _) in ranked]
+	else:
+		running.stop()
+		path = base + '.folded'
+		top = running.write(path)
+	return {'profiler': kind, 'path': path, 'top': top}
+
+'''
+write(path)
+path: path of the JSON report, defaults to REPORT_PATH
+
+Stops any profiler & writes the JSON report to path & the Prometheus text next to it, at the end of a batch
+
+Returns the report dict
+'''
+def write(path=None):
+	path = path or REPORT_PATH
+	base = os.path.splitext(path)[0]
+	directory = os.path.dirname(path)
+	if directory != "":
+		os.makedirs(directory, exist_ok=True)
+
+	profile = stopProfiling(base)
+	report = collector.report()
+	if profile != None:
+		report['profile'] = profile
+
+	with open(path, 'w') as f:
+		json.dump(report, f, indent='\t')
+	with open(base + '.prom', 'w') as f:
+		f.write(collector.prometheus())
+	return report
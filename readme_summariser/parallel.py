@@ -0,0 +1,137 @@
+import os
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from readme_summariser import summarise, dedupe
+
+'''
+SIMILAR_COUNT: number of similar repos fetched & summarised for each repo
+WORKERS: number of threads fetching READMEs & processes summarising them
+BATCH_SIZE: number of READMEs summarised together by one worker process in summariseMany
+'''
+SIMILAR_COUNT = int(os.environ.get('README_SUMMARISER_SIMILAR', 5))
+WORKERS = int(os.environ.get('README_SUMMARISER_WORKERS', SIMILAR_COUNT))
+BATCH_SIZE = int(os.environ.get('README_SUMMARISER_BATCH', 32))
+
+threads = None
+processes = None
+
+'''
+getPools()
+
+Starts the thread & process pools on first use so later repos reuse the same workers, the process pool is started again if a worker died.
+Processes are forked so the calling script is not re-run in every worker, all of them as soon as the pool starts, before the thread pool & before the service takes requests,
+so no worker copies a lock held by another thread. Where fork is unavailable summarising falls back to the thread pool
+
+Returns the thread pool & the process pool
+'''
+def getPools():
+	global processes
+	if processes == None:
+		if 'fork' in multiprocessing.get_all_start_methods():
+			processes = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context('fork'))
+			processes.submit(int).result()
+		else:
+			processes = getThreads()
+	return getThreads(), processes
+
+'''
+getThreads()
+
+Returns the thread pool, starting it on first use
+'''
+def getThreads():
+	global threads
+	if threads == None:
+		threads = ThreadPoolExecutor(max_workers=WORKERS)
+	return threads
+
+'''
+dropProcesses(pool)
+pool: process pool that raised BrokenProcessPool
+
+Shuts the broken process pool down so the next getPools starts a new one
+'''
+def dropProcesses(pool):
+	global processes
+	if processes is pool:
+		processes = None
+	pool.shutdown(wait=False, cancel_futures=True)
+
+'''
+summariseAll(URLs, fetchContent, exclude)
+URLs: list of README API URL's in ranking order
+fetchContent: function taking a URL & returning the cleaned README or an empty string
+exclude: cleaned README of the repo the READMEs are similar repos of, its copies & near-duplicates are left out & its summary is never reused for them
+
+Fetches every README at once on the thread pool, as each one arrives (in ranking order) it is summarised on the process pool.
+Near-duplicate READMEs are collapsed to the first of them as they arrive, & READMEs already in the summary cache (or near-duplicates of one) are not sent to the process pool.
+If a worker process dies the BrokenProcessPool is raised & the pool is started again for the next call
+
+Returns a dict of summaries & their processed sentences (see summarise.compute) keyed by ranking position
+'''
+def summariseAll(URLs, fetchContent, exclude=""):
+	threads, processes = getPools()
+	fetchJobs = [threads.submit(fetchContent, URL) for URL in URLs]
+	seen = dedupe.Distinct() if dedupe.ENABLED else None
+	if seen != None and exclude != "":
+		seen.keep(exclude)
+	excludeHash = summarise.key(exclude)[0] if exclude != "" else None
+
+	try:
+		summaryJobs = []
+		for fetchJob in fetchJobs:
+			content = fetchJob.result()
+			if (exclude != "" and content == exclude) or (seen != None and not seen.keep(content)):
+				continue
+			entry = summarise.cached(content, exclude=excludeHash)
+			if entry == None:
+				summaryJobs.append((content, processes.submit(summarise.compute, content)))
+			else:
+				summaryJobs.append((content, entry))
+
+		similar = {}
+		for i, (content, job) in enumerate(summaryJobs):
+			if isinstance(job, tuple):
+				similar[i] = job
+			else:
+				similar[i] = job.result()
+				summarise.keep(content, similar[i])
+	except BrokenProcessPool:
+		dropProcesses(processes)
+		raise
+	return similar
+
+'''
+summariseMany(contents, words)
+contents: iterable of cleaned READMEs
+words: word budget of each summary
+
+Summarises many READMEs at once, READMEs already in the summary cache (or near-duplicates of one) are not summarised again.
+The rest are split into batches of BATCH_SIZE which share their summariser setup,
+if there is more than one batch they are spread across the process pool, which is started again for the next call if a worker dies
+
+Returns the list of summaries in the order of contents
+'''
+def summariseMany(contents, words=50):
+	contents = list(contents)
+	entries = [summarise.cached(content, words) for content in contents]
+
+	missing = [i for i, entry in enumerate(entries) if entry == None]
+	batches = [missing[start:start + BATCH_SIZE] for start in range(0, len(missing), BATCH_SIZE)]
+	if len(batches) > 1:
+		threads, processes = getPools()
+		try:
+			jobs = [processes.submit(summarise.computeMany, [contents[i] for i in batch], words) for batch in batches]
+			results = [job.result() for job in jobs]
+		except BrokenProcessPool:
+			dropProcesses(processes)
+			raise
+	else:
+		results = [summarise.computeMany([contents[i] for i in batch], words) for batch in batches]
+
+	for batch, batchEntries in zip(batches, results):
+		for i, entry in zip(batch, batchEntries):
+			entries[i] = entry
+	summarise.keepMany([(contents[i], entries[i]) for i in missing], words)
+	return [entry[0] for entry in entries]
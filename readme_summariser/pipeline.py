@@ -0,0 +1,140 @@
+import re
+from random import shuffle
+from readme_summariser import fallback, topics, similar, metrics
+from readme_summariser.state import getState
+from readme_summariser.document import Document
+
+'''
+MIN_LENGTH: cleaned README length a repo needs before it is worth summarising in a harvest
+'''
+MIN_LENGTH = 250
+
+'''
+summariseDocument(repo, document, topicFallback, minLength)
+repo: repo ID ('owner/repo')
+document: the repo's README Document, its topics are used if they were fetched with it
+topicFallback: function suggesting candidate topics for repos without GitHub topics, asks the user by default
+minLength: cleaned README length needed for the repo to be summarised
+
+Finds the sentence, README & similar repo summaries of the README, the time spent on each stage is traced in metrics under the repo
+
+Returns a record dict of the repo, with 'sufficient' false & no summaries if it was not found or is too short
+'''
+def summariseDocument(repo, document, topicFallback=fallback.prompt, minLength=MIN_LENGTH):
+	with metrics.trace(repo, {'readme': document.elapsed}):
+		record = {'repo': repo, 'url': 'https://github.com/' + repo, 'found': document.found, 'status': document.status, 'sha': document.sha, 'truncated': document.truncated}
+		record['sufficient'] = document.found and len(document.content) > minLength
+		if not record['sufficient']:
+			return record
+
+		'''
+		Find first 4 regex'ed sentences of repo
+		'''
+		sentenceSummary = document.sentences(4)
+		record['sentence'] = ''.join([char if ord(char) < 128 else '' for char in sentenceSummary])
+
+		'''
+		Find single README summary
+		'''
+		READMESummary = document.summarise()
+		record['readme'] = ''.join([char if ord(char) < 128 else '' for char in READMESummary])
+
+		'''
+		Find similar repo summary, a repo left without a topic has nothing to search for
+		'''
+		record['topic'] = topics.topicsPrint(f'https://api.github.com/repos/{repo}/topics', record['readme'], topicFallback, document.topics)
+		if record['topic']:
+			record['similar'] = similar.similarSummary(record['topic'], '/' + repo, document.content)
+		else:
+			record['similar'] = ""
+
+		return record
+
+'''
+summariseChanged(repo, document, topicFallback, minLength)
+repo: repo ID ('owner/repo')
+document: the repo's README Document
+topicFallback: function suggesting candidate topics for repos without GitHub topics, asks the user by default
+minLength: cleaned README length needed for the repo to be summarised
+
+Incremental summariseDocument, if the README has the same SHA as when the repo was last summarised the stored record is returned without cleaning or summarising anything.
+Otherwise the repo is summarised & its record stored in the harvest state
+
+Returns the repo's record dict
+'''
+def summariseChanged(repo, document, topicFallback=fallback.prompt, minLength=MIN_LENGTH):
+	if document.found:
+		stored = getState().get(repo, document.sha)
+		if stored != None and stored['record'] != None:
+			metrics.count('harvest_state', result='unchanged')
+			return stored['record']
+		metrics.count('harvest_state', result='changed')
+
+	record = summariseDocument(repo, document, topicFallback, minLength)
+	if document.found:
+		getState().put(repo, document.sha, len(document.content), record)
+	return record
+
+'''
+summariseRepo(owner, name, topicFallback, minLength)
+owner: GitHub user or organisation
+name: repo name
+topicFallback: function suggesting candidate topics for repos without GitHub topics, asks the user by default
+minLength: cleaned README length needed for the repo to be summarised, any README by default
+
+Fetches & summarises a single repo
+
+Returns a record dict with the keys
+repo, url: the repo ID & its GitHub URL
+found: whether the README was found
+status: HTTP status the README was fetched with, 404 if it does not exist & any other failure if it could not be fetched
+sha: git blob SHA of the README, None if it was not found
+truncated: whether part of the README was left out to keep it within the processing budget
+sufficient: whether the README was long enough to summarise, the remaining keys are only present if it was
+sentence: first 4 sentences of the README
+readme: README summary
+topic: topic chosen to find similar repos, empty if none was found
+similar: summary of the similar repos, empty if there was no topic to find them with
+'''
+def summariseRepo(owner, name, topicFallback=fallback.prompt, minLength=0):
+	repo = owner + '/' + name
+	document = Document(f'https://api.github.com/repos/{repo}/contents/README.md')
+	return summariseDocument(repo, document, topicFallback, minLength)
+
+'''
+askSummary()
+
+Asks the user to write their own summary until they enter 'END'
+
+Returns the user summary
+'''
+def askSummary():
+	userSummary = ""
+	line = ""
+	while line != "END":
+		line = input("Enter your summary: (type 'END' to terminate input)\n")
+		userSummary += line + '\n'
+	userSummary = re.sub(r'END', '', userSummary)
+	print(userSummary)
+	return userSummary
+
+'''
+writeShuffled(f, record)
+f: file the summaries are written to
+record: sufficient repo record dict with a user summary under 'submitted'
+
+Shuffles the four summaries of the repo & writes them without identifying which is which
+'''
+def writeShuffled(f, record):
+	fList = {}
+	fList[0] = "=SENTENC=\n" + record['sentence'] + "\n========="
+	fList[1] = "=README!=\n" + record['readme'] + "\n========="
+	fList[2] = "=SIMILAR=\n" + record['similar'] + "\n========="
+	fList[3] = "=SUBMITD=\n" + record['submitted'] + "========="
+
+	shuffle(fList)
+	for i in fList:
+		f.write(fList[i] + '\n')
+	f.flush()
+
+	# I will then copy the file & regex out the identifying titles to present while keeping a master copy for scoring
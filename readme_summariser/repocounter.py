@@ -0,0 +1,153 @@
+import requests
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from readme_summariser import fetch, graphql
+from readme_summariser.document import Document
+from readme_summariser.state import getState
+
+'''
+pageURLs(page)
+page: number of the reporeapers results page
+
+Requests the results page & finds all repo API links in it
+
+Returns a list of repo API URL's or None if the page is not found
+'''
+def pageURLs(page):
+	url = 'http://reporeapers.github.io/results/' + str(page) + '.html'
+	req = fetch.get(url)
+	'''
+	Check whether page is found (incase of client error)
+	'''
+	if req.status_code == requests.codes.ok:
+		return re.findall('(https://ap[\w_-]+(?:(?:\.[\w_-]+)+)[\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])', req.text)
+	return None
+
+'''
+readmeStatus(document, length)
+document: README Document of the repo
+length: length of the cleaned README if it is already known
+
+Determines whether the README can be summarised or not
+
+Returns 'none' if the repo has no README (404), 'failed' if the request failed for any other reason, 'short' if it is too short to summarise, otherwise 'okay'
+'''
+def readmeStatus(document, length=None):
+	if document.found:
+		if length == None:
+			length = len(document.content)
+		if length > 250:
+			return 'okay'
+		return 'short'
+	if document.status == requests.codes.not_found:
+		return 'none'
+	return 'failed'
+
+'''
+storedLength(repo, document)
+repo: repo ID
+document: README Document of the repo
+
+Looks up the cleaned length of the README in the harvest state, the README is only cleaned (& its length stored) if its SHA has changed
+
+Returns the length of the cleaned README
+'''
+def storedLength(repo, document):
+	stored = getState().get(repo, document.sha)
+	if stored != None and stored['length'] != None:
+		return stored['length']
+	length = len(document.content)
+	getState().put(repo, document.sha, length)
+	return length
+
+'''
+readmeStatuses(items, batched, incremental)
+items: list of repo API URL's
+batched: whether to fetch the READMEs in one GraphQL request instead of one REST request each
+incremental: whether to reuse the cleaned lengths of READMEs unchanged since the last run
+
+Returns the readmeStatus of each repo in order
+'''
+def readmeStatuses(items, batched=False, incremental=False):
+	repos = [re.sub(r'https://api.github.com/repos/', '', item) for item in items]
+	if batched:
+		fetched = graphql.fetchDocuments(repos)
+		documents = [fetched[repo] for repo in repos]
+	else:
+		documents = [Document(item + '/contents/README.md') for item in items]
+
+	statuses = []
+	for repo, document in zip(repos, documents):
+		length = None
+		if incremental and document.found:
+			length = storedLength(repo, document)
+		statuses.append(readmeStatus(document, length))
+	return statuses
+
+'''
+main(argv)
+argv: command line arguments, an integer for the first page, '-o' to serve requests from the local cache only, '-j N' to set how many requests run at once, '-g' to fetch the READMEs in GraphQL batches & '-i' to only clean READMEs that changed since the last run
+
+Counts how many repos on each reporeapers results page have a README that can be summarised
+'''
+def main(argv):
+	init = 1
+	workers = 8
+	batched = False
+	incremental = False
+	if len(argv) > 0 and argv[0].isdigit():
+		init = int(argv[0])
+	for i, arg in enumerate(argv):
+		if arg == '-o':
+			fetch.configure(offline=True)
+		if arg == '-j':
+			workers = int(argv[i + 1])
+		if arg == '-g':
+			batched = True
+		if arg == '-i':
+			incremental = True
+
+	'''
+	Crawl the first 100 pages of database starting from 1 or parameter if provided.
+	Pages & READMEs are requested by a bounded pool of threads, repo checks are queued as soon as their page arrives
+	'''
+	pages = range(init, 100)
+	pool = ThreadPoolExecutor(max_workers=workers)
+	pageJobs = {pool.submit(pageURLs, page): page for page in pages}
+	repoJobs = {}
+	for job in as_completed(pageJobs):
+		urls = job.result()
+		if urls == None:
+			repoJobs[pageJobs[job]] = None
+		elif batched:
+			repoJobs[pageJobs[job]] = [pool.submit(readmeStatuses, urls[i:i + graphql.BATCH_SIZE], True, incremental) for i in range(0, len(urls), graphql.BATCH_SIZE)]
+		else:
+			repoJobs[pageJobs[job]] = [pool.submit(readmeStatuses, [item], False, incremental) for item in urls]
+
+	'''
+	Print statistics on README data from requests in page order
+	'''
+	for page in pages:
+		print('\n PAGE: ' + str(page) + '\n')
+		if repoJobs[page] == None:
+			print('Content was not found')
+			continue
+
+		statuses = [status for job in repoJobs[page] for status in job.result()]
+		totalC = len(statuses)
+		noneC = statuses.count('none')
+		shortC = statuses.count('short')
+		okayC = statuses.count('okay')
+		failedC = statuses.count('failed')
+
+		print("Total: " + str(totalC))
+		print("404: " + str(noneC))
+		print("200: " + str(shortC + okayC))
+		print("Short: " + str(shortC))
+		print("Sufficient: " + str(okayC))
+		print("Failed: " + str(failedC))
+
+	pool.shutdown()
+
+	scheduler = fetch.getScheduler('https://api.github.com/')
+	print("\nRate limited responses retried: " + str(scheduler.limited))
@@ -0,0 +1,216 @@
+import requests
+import re
+import sys
+from readme_summariser import fetch, fallback, pipeline, graphql
+from readme_summariser.document import Document
+from readme_summariser.checkpoint import Checkpoint, readRecords
+from readme_summariser.state import getState
+
+USAGE = 'usage: reporeaper [page] [-a] [-o] [-H] [-A] [-g] [-i] [-f prompt|rake|none]'
+
+'''
+pages(init)
+init: first reporeapers results page
+
+Yields the number & HTML of each results page from init up to 99
+'''
+def pages(init):
+	for iter in range(init, 100):
+		url = 'http://reporeapers.github.io/results/' + str(iter) + '.html'
+		req = fetch.get(url)
+		print('\n PAGE: ' + str(iter) + '\n')
+		if req.status_code == requests.codes.ok:
+			yield iter, req.text
+		else:
+			print('Content was not found')
+
+'''
+repos(pages, done)
+pages: iterable of page numbers & HTML
+done: set of completed repo ID's
+
+Yields the page number, repo ID & API URL of every repo listed on the pages that is not already completed
+'''
+def repos(pages, done):
+	for page, html in pages:
+		urls = re.findall('(https://ap[\w_-]+(?:(?:\.[\w_-]+)+)[\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])', html)
+		for item in urls:
+			repo = re.sub(r'https://api.github.com/repos/', '', item)
+			if repo not in done:
+				yield page, repo, item
+
+'''
+documents(repos)
+repos: iterable of page numbers, repo ID's & API URL's
+
+Yields the page number, repo ID, API URL & README Document of every repo with a README or without one (a 404), so repos without a README are checkpointed too.
+Repos whose README could not be fetched for any other reason are left out, so a resumed run requests them again
+'''
+def documents(repos):
+	for page, repo, item in repos:
+		document = Document(item + '/contents/README.md')
+		if document.found or document.status == requests.codes.not_found:
+			yield page, repo, item, document
+		else:
+			print('README request failed with status ' + str(document.status))
+
+'''
+batchDocuments(repos)
+repos: iterable of page numbers, repo ID's & API URL's
+
+Same as documents, but the READMEs & topics are fetched graphql.BATCH_SIZE repos per GraphQL request
+'''
+def batchDocuments(repos):
+	batch = []
+	for entry in repos:
+		batch.append(entry)
+		if len(batch) == graphql.BATCH_SIZE:
+			yield from fetchBatch(batch)
+			batch = []
+	yield from fetchBatch(batch)
+
+'''
+fetchBatch(batch)
+batch: list of page numbers, repo ID's & API URL's
+
+Yields the page number, repo ID, API URL & README Document of every repo in the batch with a README or without one (a 404), as documents does
+'''
+def fetchBatch(batch):
+	fetched = graphql.fetchDocuments([repo for page, repo, item in batch])
+	for page, repo, item in batch:
+		document = fetched[repo]
+		if document.found or document.status == requests.codes.not_found:
+			yield page, repo, item, document
+		else:
+			print('README request failed with status ' + str(document.status))
+
+'''
+summaries(documents, topicFallback, incremental)
+documents: iterable of page numbers, repo ID's, API URL's & README Documents
+topicFallback: function suggesting candidate topics for repos without GitHub topics
+incremental: whether to reuse the stored records of repos whose README has not changed since the last harvest
+
+Finds the sentence, README & similar repo summaries of every README long enough to summarise
+
+Yields a record dict for each repo, with 'sufficient' false & no summaries if it has no README or it is too short
+'''
+def summaries(documents, topicFallback=fallback.prompt, incremental=False):
+	summariseDocument = pipeline.summariseChanged if incremental else pipeline.summariseDocument
+	for page, repo, item, document in documents:
+		record = summariseDocument(repo, document, topicFallback)
+		record['page'] = page
+		if record['sufficient']:
+			print(record['url'])
+		elif record['found']:
+			print('Content found but is not sufficient')
+		else:
+			print('Content was not found')
+		yield record
+
+'''
+annotate(records)
+records: iterable of repo record dicts
+
+Asks the user for their own summary of every sufficient repo that does not already have one
+
+Yields each record, with the user summary under 'submitted'
+'''
+def annotate(records):
+	for record in records:
+		if record['sufficient'] and 'submitted' not in record:
+			record['submitted'] = pipeline.askSummary()
+		yield record
+
+'''
+writeHidden(g, record)
+g: file the shuffled summaries are written to
+record: sufficient repo record dict
+
+Writes the repo URL followed by its four summaries shuffled
+'''
+def writeHidden(g, record):
+	g.write('\n' + record['url'] + '\n')
+	pipeline.writeShuffled(g, record)
+
+'''
+main(argv)
+argv: command line arguments, an integer for the first page & the flags
+-a: resume the previous run
+-o: serve requests from the local cache only
+-H: headless, run every automated stage into queue.jsonl without asking the user for anything
+-A: annotate, ask for the user summaries of the repos already in queue.jsonl
+-f NAME: fallback used for repos without GitHub topics, one of prompt, rake or none (rake when headless, otherwise prompt)
+-g: fetch READMEs & topics in GraphQL batches instead of two REST requests per repo
+-i: incremental, repos whose README is unchanged since the last harvest reuse their stored summaries (& user summary) instead of being summarised again
+
+Returns 2 after printing the usage if -f is not followed by a fallback name
+'''
+def main(argv):
+	init = 1
+	append = False
+	headless = False
+	annotateOnly = False
+	topicFallback = None
+	fetchDocuments = documents
+	incremental = False
+
+	for i, arg in enumerate(argv):
+		if arg == '-a':
+			append = True
+		if arg == '-o':
+			fetch.configure(offline=True)
+		if arg == '-H':
+			headless = True
+		if arg == '-A':
+			annotateOnly = True
+		if arg == '-f':
+			if i + 1 == len(argv) or argv[i + 1] not in fallback.FALLBACKS:
+				print(USAGE, file=sys.stderr)
+				return 2
+			topicFallback = fallback.FALLBACKS[argv[i + 1]]
+		if arg == '-g':
+			fetchDocuments = batchDocuments
+		if arg == '-i':
+			incremental = True
+	if len(argv) > 0 and argv[0].isdigit():
+		init = int(argv[0])
+	if topicFallback == None:
+		topicFallback = fallback.rake if headless else fallback.prompt
+
+	'''
+	Headless: stream every repo through the automated stages, each finished record is queued in queue.jsonl & checkpointed in queue.txt
+	'''
+	if headless:
+		queue = Checkpoint("queue.txt", "queue.jsonl", append)
+		for record in summaries(fetchDocuments(repos(pages(init), queue.done)), topicFallback, incremental):
+			queue.complete(record)
+		queue.close()
+		return
+
+	if append:
+		f = open("outputLabelled.txt", "a+")
+		g = open("outputHidden.txt","a+")
+	else:
+		f = open("outputLabelled.txt", "w+")
+		g = open("outputHidden.txt","w+")
+
+	'''
+	Stream every repo through the pipeline, each finished repo is written to output.jsonl & checkpointed straight away.
+	When resuming, completed repos are skipped before any of their requests are made.
+	When annotating, the records come from queue.jsonl so only the user summaries are left to do
+	'''
+	checkpoint = Checkpoint("checkpoint.txt", "output.jsonl", append)
+	if annotateOnly:
+		records = (record for record in readRecords("queue.jsonl") if record['repo'] not in checkpoint.done)
+	else:
+		records = summaries(fetchDocuments(repos(pages(init), checkpoint.done)), topicFallback, incremental)
+
+	for record in annotate(records):
+		if record['sufficient']:
+			writeHidden(g, record)
+		checkpoint.complete(record)
+		if incremental and record['sufficient']:
+			getState().put(record['repo'], record['sha'], record=record)
+	checkpoint.close()
+	g.close()
+	f.close()
@@ -0,0 +1,209 @@
+import os
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+
+'''
+BURST: number of requests a token may run ahead of spending its quota evenly before requests are paced
+WINDOWS: seconds between resets of each GitHub rate limit resource, used to work out the even spending rate
+BACKOFF: seconds the first retry of a rate limit without a Retry-After header waits, doubled for every further retry
+'''
+BURST = int(os.environ.get('README_SUMMARISER_BURST', 100))
+BACKOFF = int(os.environ.get('README_SUMMARISER_BACKOFF', 60))
+WINDOWS = {'core': 60 * 60, 'graphql': 60 * 60, 'search': 60}
+
+log = logging.getLogger(__name__)
+
+'''
+Quota(resource)
+resource: GitHub rate limit resource, e.g. core, graphql or search
+
+One rate limit of a token as last reported by GitHub
+limit, remaining: size of the quota & how much of it is left, None until a response reports them
+reset: time the quota resets
+window: seconds between resets
+'''
+class Quota:
+	def __init__(self, resource):
+		self.limit = None
+		self.remaining = None
+		self.reset = 0
+		self.window = WINDOWS.get(resource, WINDOWS['core'])
+
+	'''
+	readyAt(now)
+	now: current time
+
+	Requests are paced once the quota is more than BURST requests ahead of being spent evenly up to the reset
+
+	Returns the earliest time the quota can be used
+	'''
+	def readyAt(self, now):
+		if self.remaining == None or self.reset <= now:
+			return 0
+		if self.remaining == 0:
+			return self.reset + 1
+		return self.reset - (self.remaining - 1 + BURST) * self.window / self.limit
+
+'''
+Token(value)
+value: GitHub OAuth token, an empty string for anonymous requests
+
+Rate limit state of one token, GitHub keeps a separate quota for each resource so a spent REST quota does not hold back GraphQL requests
+quotas: dict of resource to Quota
+pausedUntil: time the token may be used again after a Retry-After or secondary rate limit, these apply to every resource
+'''
+class Token:
+	def __init__(self, value):
+		self.value = value
+		self.quotas = {}
+		self.pausedUntil = 0
+
+	'''
+	quota(resource)
+	resource: GitHub rate limit resource
+
+	Returns the Quota of the resource, created on first use
+	'''
+	def quota(self, resource):
+		if resource not in self.quotas:
+			self.quotas[resource] = Quota(resource)
+		return self.quotas[resource]
+
+	'''
+	readyAt(now, resource)
+	now: current time
+	resource: GitHub rate limit resource the request counts against
+
+	Returns the earliest time the token can be used for the resource
+	'''
+	def readyAt(self, now, resource='core'):
+		return max(self.pausedUntil, self.quota(resource).readyAt(now))
+
+'''
+Scheduler(tokens)
+tokens: list of GitHub OAuth tokens, anonymous requests are used if it is empty
+
+Hands out the token each request is sent with & keeps track of their quotas from the X-RateLimit-* & Retry-After headers of the responses.
+The token that can be used soonest is chosen, so requests rotate onto another token once one runs low, & if every token is spent the request waits for the first reset rather than failing
+
+limited: number of rate limited responses seen
+waited: seconds spent waiting for a token
+'''
+class Scheduler:
+	def __init__(self, tokens):
+		self.tokens = [Token(value) for value in tokens] or [Token('')]
+		self.lock = threading.Lock()
+		self.limited = 0
+		self.waited = 0
+
+	'''
+	acquire(resource)
+	resource: GitHub rate limit resource the request counts against
+
+	Waits until a token can be used for the resource & counts the request against its quota
+
+	Returns the Token to send the request with
+	'''
+	def acquire(self, resource='core'):
+		while True:
+			with self.lock:
+				now = time.time()
+				token = min(self.tokens, key=lambda token: (token.readyAt(now, resource), -(token.quota(resource).remaining or 0)))
+				delay = token.readyAt(now, resource) - now
+				if delay <= 0:
+					quota = token.quota(resource)
+					if quota.remaining != None and quota.reset > now:
+						quota.remaining -= 1
+					return token
+				self.waited += delay
+
+			if delay >= 1:
+				log.info('Rate limited, waiting %ds', delay)
+			time.sleep(delay)
+
+	'''
+	update(token, req, attempt, resource)
+	token: Token the request was sent with
+	req: requests Response object
+	attempt: number of times the request has already been retried
+	resource: GitHub rate limit resource the request was counted against, used if the response has no X-RateLimit-Resource header
+
+	Records the quota GitHub reports for the token & the response's resource.
+	If the quota is spent or the response asks to retry later, the token is paused until GitHub allows it again.
+	Any 429, a 403 naming a secondary rate limit & a GraphQL reply with a RATE_LIMITED error are also rate limited,
+	without a Retry-After header they are waited out with exponential backoff starting at BACKOFF seconds, or until the reset if the quota is spent
+
+	Returns true if the request was rate limited & should be retried
+	'''
+	def update(self, token, req, attempt=0, resource='core'):
+		headers = req.headers
+		exhausted = headers.get('X-RateLimit-Remaining') == '0'
+		limited = req.status_code in (403, 429) and (exhausted or 'Retry-After' in headers or secondary(req))
+		if resource == 'graphql' and req.status_code == 200:
+			limited = graphqlLimited(req)
+
+		with self.lock:
+			now = time.time()
+			if 'X-RateLimit-Remaining' in headers and 'X-RateLimit-Reset' in headers:
+				quota = token.quota(headers.get('X-RateLimit-Resource', resource))
+				remaining = int(headers['X-RateLimit-Remaining'])
+				reset = int(headers['X-RateLimit-Reset'])
+				if reset != quota.reset or quota.remaining == None:
+					quota.remaining = remaining
+				else:
+					quota.remaining = min(quota.remaining, remaining)
+				quota.reset = reset
+				quota.limit = int(headers.get('X-RateLimit-Limit', remaining)) or 1
+
+			if 'Retry-After' in headers:
+				token.pausedUntil = max(token.pausedUntil, now + int(headers['Retry-After']))
+			elif limited and not exhausted:
+				token.pausedUntil = max(token.pausedUntil, now + BACKOFF * 2 ** attempt)
+
+			if limited:
+				self.limited += 1
+		return limited
+
+'''
+secondary(req)
+req: requests Response object with a 403 or 429 status
+
+Returns true if the response is a 429 or a 403 whose message reports a secondary rate limit
+'''
+def secondary(req):
+	if req.status_code == 429:
+		return True
+	return 'secondary rate limit' in req.text.lower()
+
+'''
+graphqlLimited(req)
+req: requests Response object of a GraphQL query
+
+GraphQL answers a spent quota with a 200 reply whose errors include a RATE_LIMITED one
+
+Returns true if the reply is rate limited
+'''
+def graphqlLimited(req):
+	if b'RATE_LIMITED' not in req.content:
+		return False
+	try:
+		errors = req.json().get('errors') or []
+	except ValueError:
+		return False
+	return any(error.get('type') == 'RATE_LIMITED' for error in errors)
+
+'''
+resource(URL)
+URL: request URL
+
+Returns the GitHub rate limit resource a request to the URL counts against
+'''
+def resource(URL):
+	path = urlsplit(URL).path
+	if path.endswith('/graphql'):
+		return 'graphql'
+	if path.startswith('/search/'):
+		return 'search'
+	return 'core'
@@ -0,0 +1,285 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from readme_summariser import fetch, fallback, lazy, parallel, pipeline, summarise, metrics
+from readme_summariser.index import getIndex
+
+'''
+Settings for the summarisation service, each can be overridden from the environment or the command line
+
+HOST, PORT: address the HTTP service listens on
+SOCKET: Unix socket path to listen on instead, unused if empty
+RESULT_TTL: seconds a finished record is served again without running the pipeline
+RESULT_SIZE: number of finished records kept in memory
+FALLBACK: fallback used for repos without GitHub topics, the service never asks for input so it is rake by default
+'''
+HOST = os.environ.get('README_SUMMARISER_HOST', '127.0.0.1')
+PORT = int(os.environ.get('README_SUMMARISER_PORT', 8347))
+SOCKET = os.environ.get('README_SUMMARISER_SOCKET', '')
+RESULT_TTL = int(os.environ.get('README_SUMMARISER_RESULT_TTL', 60 * 60))
+RESULT_SIZE = int(os.environ.get('README_SUMMARISER_RESULT_SIZE', 4096))
+FALLBACK = os.environ.get('README_SUMMARISER_SERVICE_FALLBACK', 'rake')
+
+'''
+WARM: modules imported before the service starts listening, so the first request does not pay for them
+'''
+WARM = {
+	'summa': ['nltk.tokenize', 'summa.summarizer', 'readme_summariser.textrank'],
+	'textrank': ['nltk.tokenize', 'readme_summariser.textrank'],
+}
+
+REPO = re.compile(r'^/summary/([\w.-]+)/([\w.-]+)/?$')
+
+'''
+Coalescer(compute, size, ttl, keep)
+compute: function called with the key & any extra arguments to produce its result
+size: number of finished results kept
+ttl: seconds a finished result is kept
+keep: function deciding whether a finished result is kept, every result is kept if None
+
+Runs compute at most once at a time for each key. Requests for a key already being computed wait for that computation instead of starting their own,
+finished results are kept for ttl seconds so repeated requests are answered from memory
+'''
+class Coalescer:
+	def __init__(self, compute, size, ttl, keep=None):
+		self.compute = compute
+		self.size = size
+		self.ttl = ttl
+		self.keep = keep
+		self.lock = threading.Lock()
+		self.running = {}
+		self.results = OrderedDict()
+		self.coalesced = 0
+
+	'''
+	get(key, *args)
+	key: hashable key identifying the computation
+
+	Returns the result for key, raising any exception its computation raised
+	'''
+	def get(self, key, *args):
+		with self.lock:
+			if key in self.results:
+				finished, result = self.results[key]
+				if time.time() - finished < self.ttl:
+					self.results.move_to_end(key)
+					return result
+				del self.results[key]
+
+			future = self.running.get(key)
+			owner = future == None
+			if owner:
+				future = Future()
+				self.running[key] = future
+			else:
+				self.coalesced += 1
+
+		if not owner:
+			return future.result()
+
+		try:
+			result = self.compute(key, *args)
+		except BaseException as e:
+			with self.lock:
+				del self.running[key]
+			future.set_exception(e)
+			raise
+
+		with self.lock:
+			del self.running[key]
+			if self.keep == None or self.keep(result):
+				self.results[key] = (time.time(), result)
+				while len(self.results) > self.size:
+					self.results.popitem(last=False)
+		future.set_result(result)
+		return result
+
+	'''
+	forget(key)
+
+	Drops the finished result for key so the next request recomputes it
+	'''
+	def forget(self, key):
+		with self.lock:
+			self.results.pop(key, None)
+
+'''
+compute(key)
+key: (owner, name, fallbackName) tuple, fallbackName is the topic fallback used if the repo has no GitHub topics
+
+Returns the record of the repo from the summarise-repo pipeline
+'''
+def compute(key):
+	owner, name, fallbackName = key
+	return pipeline.summariseRepo(owner, name, fallback.FALLBACKS[fallbackName])
+
+'''
+settled(record)
+record: repo record
+
+Returns whether the record can be served again, a README that failed to fetch for any reason other than a 404 is retried by the next request
+'''
+def settled(record):
+	return record['found'] or record['status'] == 404
+
+records = Coalescer(compute, RESULT_SIZE, RESULT_TTL, settled)
+
+'''
+Handler
+
+GET /summary/OWNER/REPO returns the repo's record as JSON, with the keys of pipeline.summariseRepo.
+  The status is 404 if the repo has no README & 502 if its README could not be fetched
+  ?fallback=NAME picks the topic fallback (rake or none), ?refresh=1 recomputes a record still held in memory
+GET /health returns the number of records held, being computed & coalesced
+GET /metrics returns the stage timings & counters as Prometheus text, ?format=json returns the metrics report with the slowest repos
+'''
+class Handler(BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self):
+		url = urlsplit(self.path)
+		query = parse_qs(url.query)
+
+		if url.path == '/health':
+			with records.lock:
+				body = {'held': len(records.results), 'running': len(records.running), 'coalesced': records.coalesced}
+			return self.reply(200, body)
+
+		if url.path == '/metrics':
+			if query.get('format', [''])[0] == 'json':
+				return self.reply(200, metrics.collector.report())
+			return self.reply(200, metrics.collector.prometheus(), 'text/plain; version=0.0.4')
+
+		match = REPO.match(url.path)
+		if match == None:
+			return self.reply(404, {'error': 'expected /summary/OWNER/REPO'})
+
+		name = query.get('fallback', [FALLBACK])[0]
+		if name not in fallback.FALLBACKS or name == 'prompt':
+			return self.reply(400, {'error': f'unknown fallback {name}'})
+
+		key = (match.group(1), match.group(2), name)
+		if query.get('refresh', ['0'])[0] not in ('', '0'):
+			records.forget(key)
+
+		try:
+			record = records.get(key)
+		except Exception as e:
+			return self.reply(502, {'error': str(e)})
+		if record['found']:
+			return self.reply(200, record)
+		if record['status'] == 404:
+			return self.reply(404, record)
+		self.reply(502, dict(record, error=f'README request failed with status {record["status"]}'))
+
+	'''
+	reply(status, body, contentType)
+	status: HTTP status code
+	body: dict sent as JSON, or text sent as it is with contentType
+	contentType: content type of a text body
+	'''
+	def reply(self, status, body, contentType=None):
+		if contentType == None:
+			data = json.dumps(body).encode('utf-8')
+			contentType = 'application/json'
+		else:
+			data = body.encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', contentType)
+		self.send_header('Content-Length', str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	'''
+	address_string()
+
+	Unix socket clients have no address, so they are logged as 'unix'
+	'''
+	def address_string(self):
+		if isinstance(self.client_address, tuple):
+			return self.client_address[0]
+		return 'unix'
+
+'''
+UnixServer(path, handler)
+
+Threaded HTTP server listening on a Unix socket
+'''
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+
+'''
+warm()
+
+Imports the NLP modules, starts the worker pools & opens the connection pool, response cache, summary cache & topic index before any request arrives
+'''
+def warm():
+	parallel.getPools()
+	for name in WARM.get(summarise.SUMMARISER, []):
+		lazy.load(name)
+	if FALLBACK == 'rake':
+		lazy.load('rake_nltk')
+	fetch.getSession()
+	fetch.getCache()
+	summarise.getStore()
+	getIndex()
+
+'''
+serve(host, port, socket)
+host, port: address to listen on
+socket: Unix socket path, used instead of host & port if given
+
+Warms the service & answers requests until interrupted
+'''
+def serve(host=HOST, port=PORT, socket=SOCKET):
+	warm()
+	if socket:
+		if os.path.exists(socket):
+			os.remove(socket)
+		server = UnixServer(socket, Handler)
+		print(f'listening on {socket}', file=sys.stderr)
+	else:
+		server = ThreadingHTTPServer((host, port), Handler)
+		print(f'listening on http://{host}:{server.server_address[1]}', file=sys.stderr)
+
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		if socket:
+			os.remove(socket)
+
+'''
+main(argv)
+argv: command line arguments, the flags
+-p PORT: port to listen on
+-b HOST: host to listen on
+-u PATH: listen on a Unix socket instead
+-o: serve requests from the local cache only
+'''
+def main(argv):
+	host = HOST
+	port = PORT
+	socket = SOCKET
+
+	for i, arg in enumerate(argv):
+		if arg == '-p':
+			port = int(argv[i + 1])
+		if arg == '-b':
+			host = argv[i + 1]
+		if arg == '-u':
+			socket = argv[i + 1]
+		if arg == '-o':
+			fetch.configure(offline=True)
+
+	serve(host, port, socket)
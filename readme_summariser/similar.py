@@ -0,0 +1,136 @@
+import os
+import re
+import logging
+import threading
+import requests
+from collections import OrderedDict
+from readme_summariser import fetch, parallel, lazy, metrics
+from readme_summariser.document import contentPrint
+from readme_summariser.index import getIndex
+
+'''
+GRAPHS_SIZE: number of queries whose sentence graphs are kept, so the next repo with the same topic only adds & removes the sources that differ
+'''
+GRAPHS_SIZE = int(os.environ.get('README_SUMMARISER_GRAPHS', 64))
+
+graphs = OrderedDict()
+graphsLock = threading.Lock()
+log = logging.getLogger(__name__)
+
+'''
+topicReq(req)
+req: request object for associated topic query
+
+The function regexes the request of a GitHub topic search query & finds up to SIMILAR_COUNT + 1 (6 by default) repos that GitHub first recommend, one more than is used so there are still SIMILAR_COUNT once the repo itself is left out
+
+Returns a list of repo paths in GitHub's ranking order of up to SIMILAR_COUNT + 1 in length or a None if no search results are found
+
+Could be merged with searchReq with a more succinct solution to the spider
+'''
+def topicReq(req):
+	if req.status_code == requests.codes.ok:
+		with metrics.span('topicReq'):
+			content = req.content.decode("utf-8")
+			content = content.replace('\n', ' ').replace('\r', ' ')
+			content = re.findall('<a         href="(.{1,35})"         data-ga-click="Explore, go to repository,', content) #Regex repo list
+		return content[:parallel.SIMILAR_COUNT + 1]
+	return None
+
+
+'''
+searchReq(req)
+req: request object for associated search query
+
+The function regexes the request of a GitHub search query & finds up to SIMILAR_COUNT + 1 (6 by default) repos that GitHub first recommend, as topicReq does
+
+Returns a list of repo paths in GitHub's ranking order of up to SIMILAR_COUNT + 1 in length or a None if no search results are found
+
+Could be merged with topicReq with a more succinct solution to the spider
+'''
+def searchReq(req):
+	if req.status_code == requests.codes.ok:
+		with metrics.span('searchReq'):
+			content = req.content.decode("utf-8")
+			content = content.replace('\n', ' ').replace('\r', ' ')
+			content = re.search('<ul class="repo-list">(.*)</ul>', content) #Regex repo list
+			content = content.group(0)
+			content = re.findall('&quot;url&quot;:&quot;(.{150})', content) #Pull repo URL's alongside extra tokens to prevent Regex-ing unwanted sections
+			repos = []
+			for x in content[:parallel.SIMILAR_COUNT + 1]:
+				x = x.replace('&', ' ')
+				x = re.search('http\S+', x)
+				x = x.group(0) #Regex URL from shortened strings
+				x = re.sub(r'https://github.com', '', x) # remove initial link
+				repos.append(x)
+		return repos
+	return None
+
+'''
+findSimilar(query, repo, content)
+query: search/topic string used in identifying "similar" repos
+repo: path of the repo the similar repos are for ('/owner/repo'), left out of the results
+content: cleaned README of the repo, similar READMEs that copy it are left out
+
+The function first asks the local topic index, which answers from topic & search pages already scraped & the topics of repos already crawled.
+On a miss it checks GitHub for a matching topic in their topic list.
+If it is unable to find a topic, it will then use the string as a search term as a backup.
+Repos found on GitHub are added to the index, if it is still unable to find any repos as part of the search it will return an error string.
+The READMEs of the repos are fetched & summarised in parallel
+
+Returns a dict of README summaries & their processed sentences (in order of prevalence) of the topic, search term, or an error string
+'''
+def findSimilar(query, repo=None, content=""):
+	repos = getIndex().similar(query, parallel.SIMILAR_COUNT, repo)
+	if repos == None:
+		term = re.sub(r' ', '%20', query)
+		repos = topicReq(fetch.get(f'https://github.com/topics/{term}'))
+		if repos == None or repos == []:
+			repos = searchReq(fetch.get(f'https://github.com/search?q={term}'))
+			if repos == None or repos == []:
+				return {"Error, unable to find repos with this topic"}
+		getIndex().addRanking(query, repos)
+		repos = [x for x in repos if x != repo][:parallel.SIMILAR_COUNT]
+
+	URLs = [f'https://api.github.com/repos{x}/contents/README.md' for x in repos]
+	return parallel.summariseAll(URLs, lambda URL: contentPrint(False, URL), content)
+
+'''
+getGraph(query)
+query: search/topic string used in identifying "similar" repos
+
+Keeps the most recently used GRAPHS_SIZE graphs
+
+Returns the query's SentenceGraph, a new one on first use
+'''
+def getGraph(query):
+	with graphsLock:
+		if query not in graphs:
+			graphs[query] = lazy.load('readme_summariser.textrank').SentenceGraph()
+			if len(graphs) > GRAPHS_SIZE:
+				graphs.popitem(last=False)
+		graphs.move_to_end(query)
+		return graphs[query]
+
+'''
+similarSummary(query, repo, content)
+query: search/topic string used in identifying "similar" repos
+repo: path of the repo the similar repos are for ('/owner/repo'), left out of the results
+content: cleaned README of the repo, so its own summary never ends up in the summary of its similar repos
+
+Summarises the README summaries of the similar repos together into a single summary.
+The summaries' sentences are ranked together in the query's sentence graph, which keeps the sentences of every summary already in it,
+so only the summaries new to the graph are added, with the sentences processed when they were summarised, & the sentence graph is not rebuilt
+
+Returns the summary without non-ASCII characters, or an empty string if no similar repos were found
+'''
+def similarSummary(query, repo=None, content=""):
+	with metrics.span('findSimilar'):
+		similarReposList = findSimilar(query, repo, content)
+	if not isinstance(similarReposList, dict):
+		log.info('Similar repos %s', similarReposList)
+		return ""
+	log.info('Similar repos %s', {i: similarReposList[i][0] for i in similarReposList})
+
+	with metrics.span('combine'):
+		similarRepoSummary = getGraph(query).summarize(summaries=[similarReposList[i][0] for i in similarReposList], sentences=[similarReposList[i][1] for i in similarReposList])
+	return ''.join([char if ord(char) < 128 else '' for char in similarRepoSummary])
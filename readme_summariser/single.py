@@ -0,0 +1,39 @@
+from readme_summariser import pipeline
+
+'''
+main(argv)
+argv: command line arguments, the repo URL is asked for if it is not given
+
+Summarises a single repo in four ways (first sentences, README summary, similar repo summary & the user's own) & writes them shuffled to summa.txt
+'''
+def main(argv):
+	if len(argv) > 0:
+		selection = argv[0]
+	else:
+		selection = input("Please enter the GitHub repo URL:")
+	selection = selection.split('/')
+
+	present = False
+	for i, token in enumerate(selection):
+		if 'github.com' in token:
+			present = True
+			loc = i
+
+	if not present:
+		print("Error: Valid GitHub URL not provided")
+		return
+	else:
+		user = selection[loc+1]
+		repo = selection[loc+2]
+
+	record = pipeline.summariseRepo(user, repo)
+	if not record['sufficient']:
+		print('Content was not found')
+		return
+	record['submitted'] = pipeline.askSummary()
+
+	'''
+	Shuffle list & write to file
+	'''
+	with open("summa.txt", "w+") as f:
+		pipeline.writeShuffled(f, record)
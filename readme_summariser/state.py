@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+'''
+STATE_PATH: location of the SQLite harvest state, can be overridden from the environment
+'''
+STATE_PATH = os.environ.get('README_SUMMARISER_STATE', os.path.join(os.path.expanduser('~'), '.cache', 'readme_summariser', 'state.sqlite'))
+
+state = None
+
+'''
+HarvestState(path)
+path: file location of the SQLite database, created if it does not exist
+
+What the last harvest found for every repo, keyed by repo ID ('owner/repo')
+sha: git blob SHA of the README it saw
+length: length of the cleaned README
+record: the repo's record, with its summaries & topic, once it has been summarised
+Incremental runs compare a README's SHA with the stored one & reuse the stored results if it has not changed
+'''
+class HarvestState:
+	def __init__(self, path):
+		directory = os.path.dirname(path)
+		if directory != "":
+			os.makedirs(directory, exist_ok=True)
+
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute('CREATE TABLE IF NOT EXISTS repos (repo TEXT PRIMARY KEY, sha TEXT, length INTEGER, record TEXT, updated REAL)')
+		self.db.commit()
+
+	'''
+	get(repo, sha)
+	repo: repo ID
+	sha: blob SHA of the README just fetched
+
+	Returns a dict of the stored length & record (None if it was never summarised) if the README is unchanged, otherwise None
+	'''
+	def get(self, repo, sha):
+		with self.lock:
+			row = self.db.execute('SELECT length, record FROM repos WHERE repo = ? AND sha = ?', (repo, sha)).fetchone()
+		if row == None:
+			return None
+		return {'length': row[0], 'record': json.loads(row[1]) if row[1] != None else None}
+
+	'''
+	put(repo, sha, length, record)
+	repo: repo ID
+	sha: blob SHA of the README
+	length: length of the cleaned README, kept as stored if None
+	record: the repo's record, kept as stored if None & the README is unchanged
+
+	Stores what was found for the repo, a README with a new SHA drops the record stored for the old one
+	'''
+	def put(self, repo, sha, length=None, record=None):
+		with self.lock:
+			self.db.execute('''INSERT INTO repos (repo, sha, length, record, updated) VALUES (?, ?, ?, ?, ?)
+				ON CONFLICT (repo) DO UPDATE SET
+					length = COALESCE(excluded.length, CASE WHEN repos.sha = excluded.sha THEN repos.length END),
+					record = COALESCE(excluded.record, CASE WHEN repos.sha = excluded.sha THEN repos.record END),
+					sha = excluded.sha,
+					updated = excluded.updated''',
+				(repo, sha, length, json.dumps(record) if record != None else None, time.time()))
+			self.db.commit()
+
+'''
+getState()
+
+Opens the harvest state on first use
+
+Returns the shared HarvestState object
+'''
+def getState():
+	global state
+	if state == None:
+		state = HarvestState(STATE_PATH)
+	return state
@@ -0,0 +1,270 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from readme_summariser import dedupe, lazy, metrics
+
+'''
+Settings for the summary cache, each can be overridden from the environment
+
+SUMMARIES_PATH: location of the SQLite summary store
+MEMORY_SIZE: number of summaries kept in memory
+'''
+SUMMARIES_PATH = os.environ.get('README_SUMMARISER_SUMMARIES', os.path.join(os.path.expanduser('~'), '.cache', 'readme_summariser', 'summaries.sqlite'))
+MEMORY_SIZE = int(os.environ.get('README_SUMMARISER_MEMORY', 4096))
+
+'''
+summa(content, words), textrank(content, words) & textrankMany(contents, words)
+content: cleaned text to summarise
+contents: list of cleaned texts to summarise
+words: word budget of each summary
+
+Import their summariser on first use & return its summary with the processed sentences of its lines (see textrank.summaryTokens), or a list of both.
+The processed sentences are kept with the summary so the similar repo sentence graph never filters & stems them again
+'''
+def summa(content, words=50):
+	summary = lazy.load('summa.summarizer').summarize(content, words=words)
+	return summary, lazy.load('readme_summariser.textrank').summaryTokens(summary)
+
+def textrank(content, words=50):
+	return textrankMany([content], words)[0]
+
+def textrankMany(contents, words=50):
+	chosen = lazy.load('readme_summariser.textrank').chooseMany(contents, words=words)
+	return [("\n".join(sentence.text for sentence in sentences), [sentence.token for sentence in sentences]) for sentences in chosen]
+
+'''
+Summarisers that can be used, each takes the cleaned text & a word budget & returns the summary & its processed sentences.
+Their libraries are only imported the first time they summarise something
+summa: the summa library's TextRank
+textrank: readme_summariser.textrank, the same TextRank vectorised with NumPy & ranked by power iteration, it can pick different sentences from summa when the eigenvector summa reads is not the principal one
+
+BATCH_SUMMARISERS: summarisers that can take a list of texts at once & share their setup between them
+SUMMARISER is the one in use, its name is stored in every cache key so summaries from different summarisers are never mixed up
+'''
+SUMMARISERS = {'summa': summa, 'textrank': textrank}
+BATCH_SUMMARISERS = {'textrank': textrankMany}
+SUMMARISER = os.environ.get('README_SUMMARISER_ENGINE', 'summa')
+
+store = None
+
+'''
+SummaryCache(path, memorySize)
+path: file location of the SQLite database, created if it does not exist
+memorySize: number of summaries kept in the in-memory tier
+
+Two tier cache of summaries & their processed sentences keyed by (content hash, summariser, words).
+The most recently used summaries are kept in memory, every summary is also kept on disk so they last across runs.
+Stores made before the processed sentences were kept gain their column, their summaries have no sentences
+'''
+class SummaryCache:
+	def __init__(self, path, memorySize):
+		directory = os.path.dirname(path)
+		if directory != "":
+			os.makedirs(directory, exist_ok=True)
+
+		self.memorySize = memorySize
+		self.memory = OrderedDict()
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute('CREATE TABLE IF NOT EXISTS summaries (hash TEXT, summariser TEXT, words INTEGER, summary TEXT, sentences TEXT, PRIMARY KEY (hash, summariser, words))')
+		if 'sentences' not in [row[1] for row in self.db.execute('PRAGMA table_info(summaries)')]:
+			self.db.execute('ALTER TABLE summaries ADD COLUMN sentences TEXT')
+		self.db.commit()
+
+	'''
+	get(key)
+	key: tuple of content hash, summariser name & word count
+
+	Returns the cached summary & its processed sentences (None if they were not stored), or None if the key has not been summarised
+	'''
+	def get(self, key):
+		with self.lock:
+			if key in self.memory:
+				self.memory.move_to_end(key)
+				return self.memory[key]
+
+			row = self.db.execute('SELECT summary, sentences FROM summaries WHERE hash = ? AND summariser = ? AND words = ?', key).fetchone()
+			if row == None:
+				return None
+			entry = (row[0], json.loads(row[1]) if row[1] != None else None)
+			self.remember(key, entry)
+			return entry
+
+	'''
+	put(key, entry)
+	key: tuple of content hash, summariser name & word count
+	entry: summary string & its list of processed sentences
+
+	Stores the summary in both tiers
+	'''
+	def put(self, key, entry):
+		with self.lock:
+			self.remember(key, entry)
+			self.db.execute('REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)', key + self.row(entry))
+			self.db.commit()
+
+	'''
+	putMany(items)
+	items: list of (key, entry) pairs
+
+	Stores every summary in both tiers with a single write to disk
+	'''
+	def putMany(self, items):
+		with self.lock:
+			for key, entry in items:
+				self.remember(key, entry)
+			self.db.executemany('REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)', [key + self.row(entry) for key, entry in items])
+			self.db.commit()
+
+	'''
+	row(entry)
+	entry: summary string & its list of processed sentences
+
+	Returns the summary & sentences columns of the entry
+	'''
+	def row(self, entry):
+		return (entry[0], json.dumps(entry[1]) if entry[1] != None else None)
+
+	'''
+	remember(key, entry)
+	key: tuple of content hash, summariser name & word count
+	entry: summary string & its list of processed sentences
+
+	Adds the summary to the in-memory tier, dropping the least recently used one when it is full.
+	Expects the caller to hold the lock
+	'''
+	def remember(self, key, entry):
+		self.memory[key] = entry
+		self.memory.move_to_end(key)
+		if len(self.memory) > self.memorySize:
+			self.memory.popitem(last=False)
+
+'''
+getStore()
+
+Opens the summary cache on first use
+
+Returns the shared SummaryCache object
+'''
+def getStore():
+	global store
+	if store == None:
+		store = SummaryCache(SUMMARIES_PATH, MEMORY_SIZE)
+	return store
+
+'''
+key(content, words)
+content: cleaned text to summarise
+words: word budget of the summary
+
+Returns the cache key of the summary
+'''
+def key(content, words=50):
+	return (hashlib.sha1(content.encode('utf-8')).hexdigest(), SUMMARISER, words)
+
+'''
+compute(content, words)
+content: cleaned text to summarise
+words: word budget of the summary
+
+Summarises the text using SUMMARISER without the cache, used by worker processes
+
+Returns the summary & its processed sentences
+'''
+def compute(content, words=50):
+	with metrics.span('summarize'):
+		return SUMMARISERS[SUMMARISER](content, words=words)
+
+'''
+computeMany(contents, words)
+contents: list of cleaned texts to summarise
+words: word budget of each summary
+
+Summarises every text using SUMMARISER without the cache, in one batch if the summariser supports it
+
+Returns the list of summaries & their processed sentences in order
+'''
+def computeMany(contents, words=50):
+	if SUMMARISER in BATCH_SUMMARISERS:
+		with metrics.span('summarize'):
+			return BATCH_SUMMARISERS[SUMMARISER](contents, words=words)
+	return [compute(content, words) for content in contents]
+
+'''
+cached(content, words, exclude)
+content: cleaned text to summarise
+words: word budget of the summary
+exclude: content hash of a README whose summary is never reused, e.g. the repo the text is a similar repo of
+
+Looks the text up in the summary cache. On a miss the duplicate index is asked for a near-duplicate README (a fork, template or boilerplate copy),
+whose summary is reused & cached under the text's own key
+
+Returns the summary & its processed sentences, or None if neither the text nor a near-duplicate has been summarised
+'''
+def cached(content, words=50, exclude=None):
+	contentKey = key(content, words)
+	entry = getStore().get(contentKey)
+	if entry != None:
+		metrics.count('summary_cache', result='hit')
+		return entry
+
+	if dedupe.ENABLED:
+		sig = dedupe.signature(content)
+		if len(sig) > 0:
+			near = dedupe.getDuplicates().find(sig, exclude)
+			if near != None:
+				entry = getStore().get((near, SUMMARISER, words))
+				if entry != None:
+					getStore().put(contentKey, entry)
+	metrics.count('summary_cache', result='miss' if entry == None else 'duplicate')
+	return entry
+
+'''
+keep(content, entry, words)
+content: cleaned text that was summarised
+entry: its summary & processed sentences, as compute returns them
+words: word budget of the summary
+
+Caches the summary & adds the text to the duplicate index so its near-duplicates can reuse the summary
+'''
+def keep(content, entry, words=50):
+	contentKey = key(content, words)
+	getStore().put(contentKey, entry)
+	if dedupe.ENABLED:
+		sig = dedupe.signature(content)
+		if len(sig) > 0:
+			dedupe.getDuplicates().add(contentKey[0], sig)
+
+'''
+keepMany(items, words)
+items: list of cleaned texts & their summaries & processed sentences
+words: word budget of the summaries
+
+Caches every summary in one transaction & adds the texts to the duplicate index
+'''
+def keepMany(items, words=50):
+	getStore().putMany([(key(content, words), entry) for content, entry in items])
+	if dedupe.ENABLED:
+		for content, entry in items:
+			sig = dedupe.signature(content)
+			if len(sig) > 0:
+				dedupe.getDuplicates().add(key(content, words)[0], sig)
+
+'''
+summarise(content, words)
+content: cleaned text to summarise
+words: word budget of the summary
+
+Summarises the text, a summary already made for the same text (or a near-duplicate of it) & word budget is reused from the cache
+
+Returns the summary
+'''
+def summarise(content, words=50):
+	entry = cached(content, words)
+	if entry == None:
+		entry = compute(content, words)
+		keep(content, entry, words)
+	return entry[0]
@@ -0,0 +1,389 @@
+import threading
+from collections import OrderedDict
+import numpy
+from scipy.sparse import csr_matrix
+from summa.preprocessing import textcleaner
+
+'''
+Vectorised TextRank, a drop in replacement for summa.summarizer.summarize(text, words=...).
+Sentences are split, filtered & stemmed with summa's own text cleaner so both engines rank the same sentences,
+the sentence graph is then built in one sparse matrix product & ranked by NumPy power iteration instead of a pure Python graph.
+summarizeMany does the same for a batch of texts, sharing the stopword & stemmer setup & building every graph in one product.
+SentenceGraph ranks the sentences of several summaries together for a multi-document summary
+
+DAMPING: PageRank damping factor, the same as summa
+TOLERANCE: power iteration stops once no score moves by more than this
+MAX_ITERATIONS: upper bound on power iterations
+'''
+DAMPING = 0.85
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 200
+
+'''
+process(sentence, stems)
+sentence: sentence text
+stems: dict of word to stem shared across texts
+
+Filters & stems the sentence like summa's clean_text_by_sentences, expects textcleaner.init_textcleanner to have been called
+
+Returns the processed sentence of space separated stemmed words
+'''
+def process(sentence, stems):
+	sentence = textcleaner.remove_stopwords(textcleaner.strip_punctuation(textcleaner.strip_numeric(sentence.lower())))
+	words = []
+	for word in sentence.split():
+		if word not in stems:
+			stems[word] = textcleaner.STEMMER.stem(word)
+		words.append(stems[word])
+	return " ".join(words)
+
+'''
+sentences(text, stems)
+text: cleaned text to summarise
+stems: dict of word to stem shared across texts, so each distinct word is only stemmed once
+
+Splits & filters the text like summa's clean_text_by_sentences, expects textcleaner.init_textcleanner to have been called
+
+Returns a list of summa SyntacticUnit sentences
+'''
+def sentences(text, stems):
+	original = textcleaner.split_sentences(text)
+	return textcleaner.merge_syntactic_units(original, [process(sentence, stems) for sentence in original])
+
+'''
+summaryTokens(summary, language)
+summary: summary made by summarize or summa, one sentence per line
+language: language used for stopwords & stemming
+
+Filters & stems every line of a summary the way its sentences were processed when it was made
+
+Returns the list of processed sentences, one per line
+'''
+def summaryTokens(summary, language='english'):
+	textcleaner.init_textcleanner(language, None)
+	stems = {}
+	return [process(line, stems) for line in summary.split("\n") if line != ""]
+
+'''
+summarySentences(summary, stems, tokens)
+summary: summary made by summarize or summa, one sentence per line
+stems: dict of word to stem shared across texts
+tokens: processed sentences of the summary's lines, as summaryTokens returns them, or None
+
+The sentences the summary was made of, taken as they were processed when tokens are given.
+Otherwise each line of the summary is one sentence & only needs filtering & stemming, expects textcleaner.init_textcleanner to have been called
+
+Returns a list of summa SyntacticUnit sentences
+'''
+def summarySentences(summary, stems, tokens=None):
+	lines = [line for line in summary.split("\n") if line != ""]
+	if tokens == None or len(tokens) != len(lines):
+		tokens = [process(line, stems) for line in lines]
+	return textcleaner.merge_syntactic_units(lines, tokens)
+
+'''
+similarities(documents)
+documents: list of documents, each a list of distinct processed sentences of space separated stemmed words
+
+Calculates summa's sentence similarity for every pair of sentences within each document at once.
+The shared word counts come from one block diagonal sentence-word matrix multiplied by its transpose,
+words are numbered per document so no work is spent on pairs from different documents.
+Each count is divided by log10 of one sentence length plus log10 of the other
+
+Returns a list of dense matrices of pairwise similarities with a zero diagonal, one per document
+'''
+def similarities(documents):
+	rows = []
+	cols = []
+	lengths = []
+	columns = 0
+	for tokens in documents:
+		vocabulary = {}
+		for token in tokens:
+			words = token.split()
+			for word in set(words):
+				rows.append(len(lengths))
+				cols.append(columns + vocabulary.setdefault(word, len(vocabulary)))
+			lengths.append(len(words))
+		columns += len(vocabulary)
+
+	occurrence = csr_matrix((numpy.ones(len(rows)), (rows, cols)), shape=(len(lengths), columns))
+	common = (occurrence @ occurrence.T).tocsr()
+	logs = numpy.log10(numpy.array(lengths, dtype=float))
+
+	weights = []
+	start = 0
+	for tokens in documents:
+		end = start + len(tokens)
+		block = common[start:end, start:end].toarray()
+		denominator = logs[start:end, None] + logs[None, start:end]
+		block = numpy.divide(block, denominator, out=numpy.zeros_like(block), where=denominator != 0)
+		numpy.fill_diagonal(block, 0)
+		weights.append(block)
+		start = end
+	return weights
+
+'''
+pagerank(weights)
+weights: square matrix of edge weights
+
+Runs weighted PageRank by power iteration until the scores converge
+
+Returns the array of scores
+'''
+def pagerank(weights):
+	count = len(weights)
+	transition = weights / weights.sum(axis=1)[:, None]
+	scores = numpy.full(count, 1 / count)
+	for _ in range(MAX_ITERATIONS):
+		updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+		if numpy.abs(updated - scores).max() < TOLERANCE:
+			return updated
+		scores = updated
+	return scores
+
+'''
+nodes(sentences)
+sentences: list of summa SyntacticUnit sentences
+
+Sentences with the same processed text share a graph node like they do in summa
+
+Returns a dict of processed sentence to node number
+'''
+def nodes(sentences):
+	numbers = {}
+	for sentence in sentences:
+		numbers.setdefault(sentence.token, len(numbers))
+	return numbers
+
+'''
+rank(sentences, weights)
+sentences: list of summa SyntacticUnit sentences
+weights: matrix of similarities between the sentence nodes
+
+Scores every sentence, if no sentences are similar every pair is weighted equally as in summa.
+Sentences without any similarity to the rest score 0
+
+Returns a list of scores in sentence order
+'''
+def rank(sentences, weights):
+	numbers = nodes(sentences)
+	if not weights.any():
+		weights = numpy.ones((len(numbers), len(numbers)))
+		numpy.fill_diagonal(weights, 0)
+
+	reachable = numpy.flatnonzero(weights.sum(axis=1))
+	scores = numpy.zeros(len(numbers))
+	if len(reachable) > 0:
+		scores[reachable] = pagerank(weights[numpy.ix_(reachable, reachable)])
+
+	return [scores[numbers[sentence.token]] for sentence in sentences]
+
+'''
+select(sentences, scores, words)
+sentences: list of summa SyntacticUnit sentences
+scores: list of sentence scores
+words: word budget of the summary
+
+Takes sentences from the highest score down while each one brings the word count closer to the budget, as summa does
+
+Returns the chosen sentences in their original order
+'''
+def select(sentences, scores, words):
+	ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+	chosen = []
+	wordCount = 0
+	for i in ranked:
+		sentenceWords = len(sentences[i].text.split())
+		if abs(words - wordCount - sentenceWords) > abs(words - wordCount):
+			break
+		chosen.append(i)
+		wordCount += sentenceWords
+
+	return [sentences[i] for i in sorted(chosen)]
+
+'''
+chooseMany(texts, words, language)
+texts: iterable of cleaned texts to summarise
+words: word budget of each summary
+language: language used for stopwords & stemming
+
+Ranks the sentences of every text with one stopword & stemmer setup & one matrix product for all the sentence graphs
+
+Returns a list of the sentences chosen for each text's summary in the order of the texts, empty if no sentence could be ranked
+'''
+def chooseMany(texts, words=50, language='english'):
+	textcleaner.init_textcleanner(language, None)
+	stems = {}
+	documents = [sentences(text, stems) for text in texts]
+	weights = similarities([list(nodes(document)) for document in documents])
+
+	chosen = []
+	for document, documentWeights in zip(documents, weights):
+		if len(document) == 0:
+			chosen.append([])
+			continue
+
+		scores = rank(document, documentWeights)
+		if not any(scores):
+			chosen.append([])
+			continue
+
+		chosen.append(select(document, scores, words))
+	return chosen
+
+'''
+summarizeMany(texts, words, language)
+texts: iterable of cleaned texts to summarise
+words: word budget of each summary
+language: language used for stopwords & stemming
+
+Summarises every text like chooseMany
+
+Returns the list of summaries in the order of the texts, a summary is an empty string if no sentence could be ranked
+'''
+def summarizeMany(texts, words=50, language='english'):
+	return ["\n".join(sentence.text for sentence in sentences) for sentences in chooseMany(texts, words, language)]
+
+'''
+summarize(text, words, language)
+text: cleaned text to summarise
+words: word budget of the summary
+language: language used for stopwords & stemming
+
+Returns the summary sentences joined by newlines, or an empty string if no sentence could be ranked
+'''
+def summarize(text, words=50, language='english'):
+	return summarizeMany([text], words, language)[0]
+
+'''
+SentenceGraph(language)
+language: language used for stopwords & stemming
+
+Sentence graph over several summaries (sources) for a summary of summaries, sources can be added & removed one at a time.
+Each source keeps its processed sentences, so they are never split or stemmed again, & each sentence node keeps its set of stemmed words.
+Adding a source only weighs its new nodes against the rest & removing one only drops the nodes no other source shares, the other edge weights are kept
+'''
+class SentenceGraph:
+	def __init__(self, language='english'):
+		self.language = language
+		self.stems = {}
+		self.sources = OrderedDict()
+		self.nodes = {}
+		self.terms = []
+		self.lengths = []
+		self.uses = []
+		self.weights = numpy.zeros((0, 0))
+		self.lock = threading.RLock()
+
+	'''
+	add(summary, tokens)
+	summary: summary of one source
+	tokens: processed sentences of the summary's lines, as they were stored with it in the summary cache, or None to process them here
+
+	Adds the summary's sentences to the graph, a summary already in it is left as it is
+	'''
+	def add(self, summary, tokens=None):
+		with self.lock:
+			if summary in self.sources:
+				return
+			if tokens == None:
+				textcleaner.init_textcleanner(self.language, None)
+			self.sources[summary] = summarySentences(summary, self.stems, tokens)
+
+			new = []
+			for sentence in self.sources[summary]:
+				if sentence.token in self.nodes:
+					self.uses[self.nodes[sentence.token]] += 1
+					continue
+				self.nodes[sentence.token] = len(self.terms)
+				words = sentence.token.split()
+				self.terms.append(set(words))
+				self.lengths.append(len(words))
+				self.uses.append(1)
+				new.append(len(self.terms) - 1)
+			if len(new) > 0:
+				self.extend(new)
+
+	'''
+	extend(new)
+	new: numbers of the nodes just added, the last ones
+
+	Weighs the new nodes against every node with summa's sentence similarity, expects the caller to hold the lock
+	'''
+	def extend(self, new):
+		count = len(self.terms)
+		weights = numpy.zeros((count, count))
+		weights[:count - len(new), :count - len(new)] = self.weights
+		logs = numpy.log10(numpy.array(self.lengths, dtype=float))
+		for i in new:
+			shared = numpy.array([len(self.terms[i] & other) for other in self.terms], dtype=float)
+			denominator = logs[i] + logs
+			row = numpy.divide(shared, denominator, out=numpy.zeros(count), where=denominator != 0)
+			row[i] = 0
+			weights[i] = row
+			weights[:, i] = row
+		self.weights = weights
+
+	'''
+	remove(summary)
+	summary: summary of one source
+
+	Takes the summary's sentences out of the graph, dropping the nodes no other source shares
+	'''
+	def remove(self, summary):
+		with self.lock:
+			if summary not in self.sources:
+				return
+			for sentence in self.sources.pop(summary):
+				self.uses[self.nodes[sentence.token]] -= 1
+
+			kept = [node for node, uses in enumerate(self.uses) if uses > 0]
+			if len(kept) == len(self.uses):
+				return
+			renumber = {node: i for i, node in enumerate(kept)}
+			self.nodes = {token: renumber[node] for token, node in self.nodes.items() if node in renumber}
+			self.terms = [self.terms[node] for node in kept]
+			self.lengths = [self.lengths[node] for node in kept]
+			self.uses = [self.uses[node] for node in kept]
+			self.weights = self.weights[numpy.ix_(kept, kept)]
+
+	'''
+	update(summaries, sentences)
+	summaries: list of source summaries in ranking order
+	sentences: list of the processed sentences of each summary in the same order (see add), or None
+
+	Removes the sources not in the list, adds the new ones & puts them in the list's order
+	'''
+	def update(self, summaries, sentences=None):
+		tokens = dict(zip(summaries, sentences)) if sentences != None else {}
+		summaries = list(dict.fromkeys(summaries))
+		with self.lock:
+			for summary in [summary for summary in self.sources if summary not in summaries]:
+				self.remove(summary)
+			for summary in summaries:
+				self.add(summary, tokens.get(summary))
+				self.sources.move_to_end(summary)
+
+	'''
+	summarize(words, summaries, sentences)
+	words: word budget of the summary
+	summaries: list of source summaries in ranking order the graph is updated to first, its current sources if None
+	sentences: list of the processed sentences of each of the summaries (see add), or None
+
+	Ranks every sentence of every source together, as summarize would rank the sources' sentences joined into one text
+
+	Returns the summary sentences joined by newlines in source order, or an empty string if no sentence could be ranked
+	'''
+	def summarize(self, words=50, summaries=None, sentences=None):
+		with self.lock:
+			if summaries != None:
+				self.update(summaries, sentences)
+			sentences = [sentence for source in self.sources.values() for sentence in source]
+			if len(sentences) == 0:
+				return ""
+			order = [self.nodes[token] for token in nodes(sentences)]
+			scores = rank(sentences, self.weights[numpy.ix_(order, order)])
+			if not any(scores):
+				return ""
+			return "\n".join(sentence.text for sentence in select(sentences, scores, words))
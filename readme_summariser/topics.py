@@ -0,0 +1,139 @@
+import os
+import re
+import math
+import logging
+import operator
+import requests
+from collections import Counter
+from readme_summariser import fetch, fallback, lazy, metrics
+from readme_summariser.index import getIndex
+
+'''
+SCORER: name of the scorer used to rank topics, 'terms' or the original 'ratcliff'
+'''
+SCORER = os.environ.get('README_SUMMARISER_TOPIC_SCORER', 'terms')
+
+WORD = re.compile(r'[a-z0-9]+')
+
+log = logging.getLogger(__name__)
+
+'''
+terms(text)
+text: string of text content
+
+Splits text into lowercase words, a trailing 's' is dropped so 'plugins' matches the topic 'plugin'
+
+Returns the list of words
+'''
+def terms(text):
+	return [word[:-1] if len(word) > 3 and word.endswith('s') else word for word in WORD.findall(text.lower())]
+
+'''
+termScores(filtered_content, topics)
+filtered_content: repo summary
+topics: list of candidate topic strings
+
+Tokenises the summary once, then scores every topic in one matrix product.
+Each topic is a row of its words scaled by 1/sqrt(number of words), the summary is a column of 1 + log(count) for those words,
+so a topic scores highly when its words are used often & multi-word topics are not favoured for length alone
+
+Returns a dict of topic to score
+'''
+def termScores(filtered_content, topics):
+	numpy = lazy.load('numpy')
+	topicTerms = [terms(topic) for topic in topics]
+	vocabulary = {}
+	for words in topicTerms:
+		for word in words:
+			vocabulary.setdefault(word, len(vocabulary))
+
+	counts = Counter(word for word in terms(filtered_content) if word in vocabulary)
+	document = numpy.zeros(len(vocabulary))
+	for word, count in counts.items():
+		document[vocabulary[word]] = 1 + math.log(count)
+
+	matrix = numpy.zeros((len(topics), len(vocabulary)))
+	for i, words in enumerate(topicTerms):
+		for word in set(words):
+			matrix[i, vocabulary[word]] = 1 / math.sqrt(len(set(words)))
+
+	scores = matrix @ document
+	return {topic: float(scores[i]) for i, topic in enumerate(topics)}
+
+'''
+ratcliffScores(filtered_content, topics)
+filtered_content: repo summary
+topics: list of candidate topic strings
+
+Scores every topic with the ratcliff_obershelp string similarity algorithm against the whole summary
+
+Returns a dict of topic to score
+'''
+def ratcliffScores(filtered_content, topics):
+	textdistance = lazy.load('textdistance')
+	scores = {}
+	for topic in topics:
+		scores[topic] = textdistance.ratcliff_obershelp(filtered_content, topic)
+	return scores
+
+SCORERS = {'terms': termScores, 'ratcliff': ratcliffScores}
+
+'''
+rank(filtered_content, topics, scorer)
+filtered_content: repo summary
+topics: list of candidate topic strings
+scorer: name of the scorer to use, defaults to SCORER
+
+Returns a dict of topic to score
+'''
+def rank(filtered_content, topics, scorer=None):
+	return SCORERS[scorer or SCORER](filtered_content, topics)
+
+'''
+best(scores)
+scores: dict of topic to score
+
+Ties are broken by the order the topics were given in, so GitHub's own ordering decides between equally scored topics
+
+Returns the highest scored topic
+'''
+def best(scores):
+	return max(scores.items(), key=operator.itemgetter(1))[0]
+
+'''
+topicsPrint(URL, filtered_content, fallback, names)
+URL: API link to repo's GitHub topics
+filtered_content: repo summary
+fallback: function suggesting candidate topics from the summary when the repo has no GitHub topics, asks the user by default
+names: the repo's GitHub topics if they have already been fetched, otherwise they are requested from URL
+
+The function checks for whether the repo has GitHub topics, which are also recorded in the local topic index. Using rank, the topic whose words are used most in the summary is used as a search term
+If the topic cannot be found, the fallback is used to find candidates, e.g. RAKE keywords or topics the user inputs. These candidates are ranked the same way
+
+returns string of highest ranked topic, or an empty string if there are no candidates
+'''
+def topicsPrint(URL, filtered_content, fallback=fallback.prompt, names=None):
+	content = []
+	if names == None:
+		headers = {'Accept':'application/vnd.github.mercy-preview+json'}
+		req = fetch.get(URL, headers = headers)
+		if req.status_code == requests.codes.ok:
+			names = req.json()['names']
+		else:
+			log.info('Topics of %s were not found', URL)
+	if names != None:
+		content = names
+		getIndex().addTopics(re.sub(r'https://api.github.com/repos|/topics$', '', URL), content)
+
+	if len(content) == 0:
+		log.info('Unable to tag %s', URL)
+		content = fallback(filtered_content)
+		if len(content) == 0:
+			return ""
+
+	with metrics.span('topics'):
+		scores = rank(filtered_content, content)
+
+	log.info('Topic scores %s', scores)
+
+	return best(scores)